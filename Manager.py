@@ -1,19 +1,39 @@
 import streamlit as st
-import speech_recognition as sr
-import pyttsx3
 import threading
 import time
 import math
-from agent import InterviewManager
-from pypdf import PdfReader
-try:
-    import docx
-except ImportError:
-    docx=None
+import datetime
+from agent import InterviewManager, get_scheduler
+from session_registry import SessionRegistry
+from term_index import build_term_index
+from question_bank import QuestionBank
+from analytics_store import AnalyticsStore
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 
 # --- Page Config ---
 st.set_page_config(page_title="Interview Practice Partner",layout="wide",page_icon="⚡")
 
+# --- Session Registry ---
+# One registry per process; evicts idle sessions and caps retained memory
+@st.cache_resource(show_spinner=False)
+def get_session_registry():
+    return SessionRegistry.from_env()
+
+@st.cache_resource(show_spinner=False)
+def get_speech_worker():
+    """Speech worker shared by all sessions; its child process (mic ring buffer and TTS) starts on first use."""
+    from speech_worker import SpeechWorker
+    return SpeechWorker()
+
+# --- Stats Endpoint (?stats) ---
+if "stats" in st.query_params:
+    st.json({
+        "sessions": get_session_registry().stats(),
+        "llm_scheduler": get_scheduler().stats(),
+        "speech_worker": get_speech_worker().stats(),
+    })
+    st.stop()
+
 # --- Theme State Management ---
 if 'theme' not in st.session_state:
     st.session_state.theme='light'
@@ -363,6 +383,71 @@ if 'interview_duration' not in st.session_state: st.session_state.interview_dura
 if 'feedback_data' not in st.session_state: st.session_state.feedback_data=None
 if 'auto_mode' not in st.session_state: st.session_state.auto_mode=True 
 if 'ending_sequence_initiated' not in st.session_state: st.session_state.ending_sequence_initiated=False
+if 'delivery' not in st.session_state: st.session_state.delivery=[]
+
+def session_key():
+    """This browser session's id (shared by the registry and the mic owners)."""
+    ctx=get_script_run_ctx()
+    return ctx.session_id if ctx else "local"
+
+# Record activity (and reload from the journal if this session was evicted)
+if st.session_state.get('ready'):
+    status=get_session_registry().touch(
+        session_key(),
+        manager=st.session_state.manager,
+        messages=st.session_state.messages,
+        settings=st.session_state.get('interview_settings'),
+        feedback=st.session_state.feedback_data
+    )
+    if status=="lost":
+        # The journal expired: the cleared interview cannot resume, so start over
+        st.session_state.manager.reset_session()
+        st.session_state.pop('interview_settings', None)
+        st.session_state.messages=[]
+        st.session_state.feedback_data=None
+        st.session_state.delivery=[]
+        st.session_state.start_time=None
+        st.session_state.auto_mode=True
+        st.session_state.ending_sequence_initiated=False
+        st.session_state.page='config'
+        st.session_state.session_lost=True
+        try:
+            get_speech_worker().close_mic(session_key())
+        except Exception:
+            pass
+
+# --- Lazy Dependencies ---
+# Heavy libraries are imported on first use (parsers after an upload, voice
+# libraries on the interview page) and shared across sessions in the process.
+@st.cache_resource(show_spinner=False)
+def load_parsers():
+    """Imports the PDF and DOCX parsers."""
+    from pypdf import PdfReader
+    try:
+        import docx
+    except ImportError:
+        docx=None
+    return PdfReader, docx
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def get_term_index(jd_text, resume_text):
+    """Tech-term index for the Thread Follower, built once per JD/resume pair."""
+    return build_term_index(jd_text, resume_text)
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def get_question_bank(role, difficulty, jd_text):
+    """Local question index used as a fallback and prompt supplement, built once per role/level/JD."""
+    return QuestionBank(role, difficulty, jd_text)
+
+@st.cache_resource(show_spinner=False)
+def get_analytics_store():
+    """Local SQLite store of finished-session metrics shared by all sessions."""
+    return AnalyticsStore.from_env()
+
+@st.cache_resource(show_spinner=False)
+def get_recognizer():
+    import speech_recognition as sr
+    return sr.Recognizer()
 
 # --- Helper Functions ---
 
@@ -372,6 +457,7 @@ def extract_text_from_file(file):
         return ""
         
     try:
+        PdfReader, docx=load_parsers()
         if file.type=="application/pdf":
             reader=PdfReader(file)
             text=""
@@ -400,13 +486,11 @@ def speak(text):
     
     st.session_state.speech_end_time=time.time()+estimated_seconds
     st.session_state.is_speaking=True
+    worker=get_speech_worker()
     
     def _run_speech():
         try:
-            engine=pyttsx3.init()
-            engine.setProperty('rate', 162) 
-            engine.say(text)
-            engine.runAndWait()
+            worker.speak(text)
         except:
             pass
         st.session_state.is_speaking = False
@@ -416,26 +500,28 @@ def speak(text):
 
 def listen(status_container):
     """Listen for user speech with 5-second timeout for silence."""
-    r = sr.Recognizer()
-    with sr.Microphone() as source:
-        # Calibrate for ambient noise
-        status_container.info("🎤 Calibrating microphone...")
-        r.adjust_for_ambient_noise(source, duration=1.0)
-        
-        # Static threshold for stability
-        r.dynamic_energy_threshold=False
-        r.energy_threshold=300
-        r.pause_threshold=3.0  
-        
-        try:
-            status_container.info("🎤 Listening(5s Timeout...")
-            audio=r.listen(source, timeout=5, phrase_time_limit=None)
-            status_container.info("⚡ Processing your answer...")
-            return r.recognize_google(audio)
-        except sr.WaitTimeoutError:
-            return None
-        except Exception:
+    try:
+        worker=get_speech_worker()
+        status_container.info("🎤 Listening(5s Timeout...")
+        # Reads from the always-on buffer, including speech that began just before this call
+        audio=worker.listen(timeout=5, pause_threshold=3.0)
+        if audio is None:
             return None
+        status_container.info("⚡ Processing your answer...")
+        text=get_recognizer().recognize_google(audio)
+        record_delivery(audio, text)
+        return text
+    except Exception:
+        return None
+
+def record_delivery(audio, text):
+    """Scores the raw answer audio locally (pace, pauses, energy, fillers)."""
+    from audio_analytics import analyze_answer
+    try:
+        features=analyze_answer(audio.get_raw_data(), audio.sample_rate, audio.sample_width, text)
+        st.session_state.delivery.append(features)
+    except Exception:
+        pass
 
 def check_time_limit():
     if st.session_state.start_time:
@@ -446,6 +532,8 @@ def check_time_limit():
 # --- PAGE 1: CONFIGURATION ---
 def render_config_page():
     st.markdown('<div class="main-header">Interview Practice Partner</div>', unsafe_allow_html=True)
+    if st.session_state.pop('session_lost', False):
+        st.warning("Your previous session expired while idle. Please set up a new interview.")
     
     st.markdown("""
     <div class="hero-background">
@@ -505,14 +593,26 @@ def render_config_page():
                 "resume_text": resume_text,
                 "jd_text": jd_text # Store JD
             }
+            # Build the indexes now so the first answer doesn't pay for them
+            get_term_index(jd_text, resume_text)
+            get_question_bank(role, difficulty, jd_text)
             st.session_state.interview_duration = duration
             st.session_state.start_time = None 
             st.session_state.page = 'interview'
             st.rerun()
 
+        if st.button("📊 Analytics Dashboard", use_container_width=True):
+            st.session_state.page = 'dashboard'
+            st.rerun()
+
 # --- PAGE 2: INTERVIEW ---
 def render_interview_page():
     st.markdown("<h2 style='text-align:center; margin-bottom: 30px;'>Live Interview Session</h2>", unsafe_allow_html=True)
+
+    if 'role' not in (st.session_state.get('interview_settings') or {}):
+        st.error("Interview settings are missing. Please set up the interview again.")
+        if st.button("🏠 Return Home"): st.session_state.page = 'config'; st.rerun()
+        return
     
     time_is_up=check_time_limit()
     
@@ -634,7 +734,9 @@ def render_interview_page():
                                     user_text, 
                                     settings['role'], 
                                     settings['difficulty'],
-                                    jd_text=settings.get('jd_text', '')
+                                    jd_text=settings.get('jd_text', ''),
+                                    term_index=get_term_index(settings.get('jd_text', ''), settings.get('resume_text', '')),
+                                    question_bank=get_question_bank(settings['role'], settings['difficulty'], settings.get('jd_text', ''))
                                 )
                             st.session_state.messages.append({"role": "ai", "content": resp})
                             speak(resp)
@@ -654,13 +756,19 @@ def render_interview_page():
             if col_btns[0].button("▶️ Begin Session"):
                 st.session_state.start_time = time.time()
                 st.session_state.auto_mode = True 
+                try:
+                    # Open the mic now so the first answer has no setup delay
+                    get_speech_worker().open_mic(session_key())
+                except Exception:
+                    pass
                 with st.spinner("Initializing..."):
                     settings = st.session_state.interview_settings
                     intro = st.session_state.manager.generate_response(
                         f"Start interview for {settings['role']}", 
                         settings['role'], 
                         settings['difficulty'],
-                        jd_text=settings.get('jd_text', '')
+                        jd_text=settings.get('jd_text', ''),
+                        question_bank=get_question_bank(settings['role'], settings['difficulty'], settings.get('jd_text', ''))
                     )
                     st.session_state.messages.append({"role": "ai", "content": intro})
                     speak(intro)
@@ -680,14 +788,40 @@ def render_interview_page():
         # 2. END BUTTON (Always visible)
         if col_btns[1].button("🛑 End & Report"):
             go_to_feedback()
+def release_mic():
+    """Stops capture for this session; the device closes once no interview holds it."""
+    try:
+        get_speech_worker().close_mic(session_key())
+    except Exception:
+        pass
+
 def go_to_feedback():
     st.session_state.auto_mode = False 
+    release_mic()
+    from audio_analytics import summarize_delivery
     with st.spinner("Generating Comprehensive Feedback..."):
-        feedback = st.session_state.manager.end_interview()
+        delivery = summarize_delivery(st.session_state.delivery)
+        feedback = st.session_state.manager.end_interview(delivery=delivery)
         st.session_state.feedback_data = feedback
+        record_session_metrics(feedback)
         st.session_state.page = 'feedback'
         st.rerun()
 
+def record_session_metrics(feedback):
+    """Appends the finished session to the analytics store (never blocks the report)."""
+    try:
+        manager = st.session_state.manager
+        start = st.session_state.start_time
+        get_analytics_store().record_session(
+            st.session_state.get('interview_settings', {}),
+            feedback,
+            duration_min=(time.time()-start)/60 if start else None,
+            turn_metrics=manager.turn_metrics,
+            report_metrics=manager.report_metrics
+        )
+    except Exception:
+        pass
+
 # --- PAGE 3: FEEDBACK ---
 def render_feedback_page():
     st.markdown("<h2 style='text-align:center; margin-bottom: 10px;'>Assessment Report</h2>", unsafe_allow_html=True)
@@ -712,6 +846,19 @@ def render_feedback_page():
     with c2: st.markdown(f"""<div class="metric-box"><h3>🗣️ Communication </h3><div class="metric-val" style="font-size: 2rem;">{data.get('communication_rating', 'N/A')}</div></div>""", unsafe_allow_html=True)
     with c3: st.markdown(f"""<div class="metric-box"><h3>🧠 Technical knowledge</h3><div class="metric-val" style="font-size: 2rem;">{data.get('technical_rating', 'N/A')}</div></div>""", unsafe_allow_html=True)
 
+    # Locally measured delivery (only when answers were recorded)
+    delivery = data.get('delivery_metrics')
+    if delivery:
+        st.markdown("<br>", unsafe_allow_html=True)
+        # Fillers are only shown when the transcripts were punctuated enough to count them
+        has_fillers = 'filler_per_100_words' in delivery
+        cols = st.columns(4 if has_fillers else 3)
+        cols[0].metric("🎙️ Speaking Rate", f"{delivery['speaking_rate_wpm']:.0f} wpm")
+        cols[1].metric("⏸️ Long Pauses", f"{delivery['long_pauses_per_min']}/min")
+        if has_fillers:
+            cols[2].metric("💬 Fillers", f"{delivery['filler_per_100_words']}/100 words")
+        cols[-1].metric("📈 Energy Variation", f"{delivery['energy_variation']:.2f}")
+
     st.markdown("<br>", unsafe_allow_html=True)
 
     col1, col2 = st.columns(2)
@@ -743,7 +890,52 @@ def render_feedback_page():
         st.session_state.messages = []
         st.session_state.start_time = None
         st.session_state.feedback_data = None # Clear old report
+        st.session_state.delivery = []
         st.session_state.manager.reset_session() # <--- CRITICAL FIX: WIPE AI MEMORY
+        release_mic()
+        st.session_state.page = 'config'
+        st.rerun()
+
+# --- PAGE 4: ANALYTICS DASHBOARD ---
+def render_dashboard_page():
+    st.markdown("<h2 style='text-align:center; margin-bottom: 10px;'>Session Analytics</h2>", unsafe_allow_html=True)
+    store = get_analytics_store()
+
+    # Filters map straight onto the indexed columns
+    f1, f2, f3 = st.columns(3)
+    role = f1.selectbox("Role", ["All"] + store.distinct("role"))
+    difficulty = f2.selectbox("Difficulty", ["All"] + store.distinct("difficulty"))
+    days = f3.selectbox("Period", [7, 30, 90, 365, "All time"], index=1, format_func=lambda d: d if d == "All time" else f"Last {d} days")
+    filters = {
+        "role": None if role == "All" else role,
+        "difficulty": None if difficulty == "All" else difficulty,
+        "since": None if days == "All time" else (datetime.date.today()-datetime.timedelta(days=days)).isoformat(),
+    }
+
+    summary = store.summary(**filters)
+    if not summary["sessions"]:
+        st.info("No finished sessions match these filters yet.")
+    else:
+        m1, m2, m3, m4 = st.columns(4)
+        m1.metric("Sessions", summary["sessions"])
+        m2.metric("Avg Score", f"{summary['avg_score'] or 0}/10")
+        m3.metric("Avg Turn Latency", f"{summary['avg_turn_latency_s'] or 0}s")
+        m4.metric("Avg Tokens / Session", f"{int(summary['avg_tokens'] or 0):,}")
+
+        trend = store.trend(**filters)
+        st.subheader("📈 Daily Trend")
+        st.line_chart({"date": [r["date"] for r in trend], "Avg Score": [r["avg_score"] for r in trend]}, x="date")
+        st.bar_chart({"date": [r["date"] for r in trend], "Sessions": [r["sessions"] for r in trend]}, x="date")
+
+        b1, b2 = st.columns(2)
+        with b1:
+            st.subheader("🎯 By Role")
+            st.dataframe(store.breakdown("role", **filters), use_container_width=True, hide_index=True)
+        with b2:
+            st.subheader("⚙️ By Difficulty")
+            st.dataframe(store.breakdown("difficulty", **filters), use_container_width=True, hide_index=True)
+
+    if st.button("🏠 Return Home"):
         st.session_state.page = 'config'
         st.rerun()
 
@@ -754,4 +946,5 @@ if not st.session_state.ready:
 
 if st.session_state.page == 'config': render_config_page()
 elif st.session_state.page == 'interview': render_interview_page()
-elif st.session_state.page == 'feedback': render_feedback_page()
\ No newline at end of file
+elif st.session_state.page == 'feedback': render_feedback_page()
+elif st.session_state.page == 'dashboard': render_dashboard_page()
\ No newline at end of file
@@ -1,22 +1,233 @@
 import os
-import google.generativeai as genai
 from dotenv import load_dotenv
 import time
 import json
+import functools
+import heapq
+import itertools
+import threading
 
 # Load environment variables
 load_dotenv()
 
+@functools.lru_cache(maxsize=None)
+def load_genai(api_key):
+    """Imports and configures google.generativeai once per process, on first use."""
+    import google.generativeai as genai
+    if api_key:
+        genai.configure(api_key=api_key)
+    return genai
+
+class SchedulerBusy(Exception):
+    """Raised when the LLM queue is full or a request waited past its timeout."""
+
+class LLMScheduler:
+    """Process-wide token-bucket rate limiter with a priority queue.
+
+    Every Gemini call in the process goes through run(). Requests wait in
+    priority order (live turns before reports) for a token, so a burst of
+    candidates queues up instead of blowing through the API quota.
+    """
+    PRIORITY_TURN=0
+    PRIORITY_REPORT=1
+
+    def __init__(self, requests_per_minute=10, burst=None, max_queue=50, queue_timeout=30.0):
+        self.rate=requests_per_minute/60.0
+        self.capacity=float(burst or max(1, requests_per_minute//2))
+        self.max_queue=max_queue
+        self.queue_timeout=queue_timeout
+
+        self._cond=threading.Condition()
+        self._queue=[]
+        self._seq=itertools.count()
+        self._tokens=self.capacity
+        self._last_refill=time.monotonic()
+
+        self._submitted=0
+        self._completed=0
+        self._rejected=0
+        self._timed_out=0
+        self._cancelled=0
+        self._throttled=0
+        self._max_depth=0
+        self._total_wait=0.0
+        self._max_wait=0.0
+
+    @classmethod
+    def from_env(cls):
+        """Builds a scheduler sized from GEMINI_RPM / GEMINI_BURST / GEMINI_MAX_QUEUE / GEMINI_QUEUE_TIMEOUT."""
+        rpm=int(os.getenv("GEMINI_RPM", "10"))
+        burst=os.getenv("GEMINI_BURST")
+        return cls(
+            requests_per_minute=rpm,
+            burst=int(burst) if burst else None,
+            max_queue=int(os.getenv("GEMINI_MAX_QUEUE", "50")),
+            queue_timeout=float(os.getenv("GEMINI_QUEUE_TIMEOUT", "30")),
+        )
+
+    def _refill(self):
+        now=time.monotonic()
+        self._tokens=min(self.capacity, self._tokens+(now-self._last_refill)*self.rate)
+        self._last_refill=now
+
+    def _acquire(self, priority, timeout, cancel=None):
+        """Blocks until this request is at the head of the queue and a token is free.
+
+        Leaves the queue with SchedulerBusy once cancel (a threading.Event) is set.
+        """
+        with self._cond:
+            if len(self._queue)>=self.max_queue:
+                self._rejected+=1
+                raise SchedulerBusy("LLM request queue is full")
+
+            ticket=(priority, next(self._seq))
+            heapq.heappush(self._queue, ticket)
+            self._submitted+=1
+            self._max_depth=max(self._max_depth, len(self._queue))
+            enqueued=time.monotonic()
+            deadline=enqueued+timeout if timeout else None
+
+            while True:
+                if cancel is not None and cancel.is_set():
+                    self._queue.remove(ticket)
+                    heapq.heapify(self._queue)
+                    self._cancelled+=1
+                    self._cond.notify_all()
+                    raise SchedulerBusy("LLM request cancelled by the caller")
+                self._refill()
+                if self._queue[0]==ticket and self._tokens>=1:
+                    heapq.heappop(self._queue)
+                    self._tokens-=1
+                    self._cond.notify_all()
+                    break
+
+                wait=(1-self._tokens)/self.rate if self._queue[0]==ticket else None
+                if deadline is not None:
+                    remaining=deadline-time.monotonic()
+                    if remaining<=0:
+                        self._queue.remove(ticket)
+                        heapq.heapify(self._queue)
+                        self._timed_out+=1
+                        self._cond.notify_all()
+                        raise SchedulerBusy("Timed out waiting for an LLM slot")
+                    wait=remaining if wait is None else min(wait, remaining)
+                if cancel is not None:
+                    # Nobody notifies on cancel, so poll for it
+                    wait=0.25 if wait is None else min(wait, 0.25)
+                self._cond.wait(wait)
+
+            waited=time.monotonic()-enqueued
+            self._total_wait+=waited
+            self._max_wait=max(self._max_wait, waited)
+
+    def _throttle(self):
+        """Empties the bucket after a quota error so every queued caller backs off."""
+        with self._cond:
+            self._throttled+=1
+            self._tokens=0.0
+            self._last_refill=time.monotonic()
+
+    def run(self, fn, priority=PRIORITY_TURN, timeout=None, retries=2, cancel=None):
+        """Calls fn() once a rate-limit token is available.
+
+        Quota errors (HTTP 429) are retried through the queue rather than
+        surfaced, so an overload shows up as extra latency. Once cancel is
+        set, fn is not called (or retried) again.
+        """
+        if timeout is None:
+            timeout=self.queue_timeout
+        for attempt in range(retries+1):
+            self._acquire(priority, timeout, cancel)
+            if cancel is not None and cancel.is_set():
+                # Gave up between getting the token and the call: hand the token back
+                with self._cond:
+                    self._tokens=min(self.capacity, self._tokens+1)
+                    self._cond.notify_all()
+                raise SchedulerBusy("LLM request cancelled by the caller")
+            try:
+                result=fn()
+            except Exception as e:
+                if attempt<retries and _is_quota_error(e):
+                    self._throttle()
+                    continue
+                raise
+            with self._cond:
+                self._completed+=1
+            return result
+
+    def stats(self):
+        """Returns queue-depth and wait-time metrics."""
+        with self._cond:
+            self._refill()
+            started=self._submitted-self._timed_out-self._cancelled-len(self._queue)
+            return {
+                "queue_depth": len(self._queue),
+                "max_queue_depth": self._max_depth,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "timed_out": self._timed_out,
+                "cancelled": self._cancelled,
+                "throttled": self._throttled,
+                "avg_wait_s": self._total_wait/started if started else 0.0,
+                "max_wait_s": self._max_wait,
+                "tokens_available": self._tokens,
+            }
+
+def _is_quota_error(e):
+    return getattr(e, "code", None)==429 or type(e).__name__ in ("ResourceExhausted", "TooManyRequests")
+
+def _call_metrics(response, started):
+    """Latency and token usage for one Gemini call."""
+    usage=getattr(response, "usage_metadata", None)
+    return {
+        "latency_s": time.perf_counter()-started,
+        "prompt_tokens": getattr(usage, "prompt_token_count", 0) or 0,
+        "output_tokens": getattr(usage, "candidates_token_count", 0) or 0,
+    }
+
+def _call_with_budget(fn, budget, cancel=None):
+    """Runs fn in a daemon thread and raises TimeoutError if it misses the budget.
+
+    On a miss cancel is set, so a call still queued in the scheduler never
+    reaches Gemini; one already in flight finishes and its result is discarded.
+    """
+    result={}
+    def target():
+        try:
+            result["value"]=fn()
+        except Exception as e:
+            result["error"]=e
+    worker=threading.Thread(target=target, name="llm-call", daemon=True)
+    worker.start()
+    worker.join(budget)
+    if worker.is_alive():
+        if cancel is not None:
+            cancel.set()
+        raise TimeoutError(f"LLM call exceeded {budget:.1f}s budget")
+    if "error" in result:
+        raise result["error"]
+    return result["value"]
+
+@functools.lru_cache(maxsize=None)
+def get_scheduler():
+    """Returns the scheduler shared by every session in this process."""
+    return LLMScheduler.from_env()
+
 class InterviewManager:
     def __init__(self):
         self.api_key=os.getenv("GEMINI_API_KEY")
         if not self.api_key:
             print("Warning: API Key not found in .env")
         
-        if self.api_key:
-            genai.configure(api_key=self.api_key)
-        
         self.history=[]
+        self.discussed_terms=set()
+        self.bank_suggested=set()
+        self.bank_served=set()
+        self.turn_metrics=[]
+        self.report_metrics=None
+        # Max seconds a live turn waits for Gemini before a question-bank fallback
+        self.latency_budget=float(os.getenv("LLM_LATENCY_BUDGET", 8))
 
     def get_system_prompt(self, role, difficulty, jd_text=""):
         # Base instructions
@@ -51,6 +262,7 @@ class InterviewManager:
              - **NO**: Ask a relevant, modern question that is currently trending or critical for a {role} role in today's industry.
         
         3. **SUBSEQUENT TURNS**: Proceed with standard technical and behavioral questions based on the JD and difficulty level. HOWEVER, if the candidate introduces a new technology/tool in their answer, ALWAYS prioritize **Protocol 6** over your planned list.
+           - Candidate turns may end with a "[QUESTION BANK: ...]" line produced by our system (not the candidate) listing vetted questions relevant to that answer. When Protocol 6 does not apply, ask one of them (rephrase freely) instead of inventing a new one.
 
         --- AGENTIC BEHAVIOR PROTOCOLS ---
         1. **THE MIRROR EFFECT**: Match the candidate's conciseness. If they are brief, move to the next question quickly. If they are detailed, acknowledge their points before moving on.
@@ -62,6 +274,7 @@ class InterviewManager:
            - If the candidate mentions a specific tool, library, or architecture (e.g., "I used Redis," "I built a microservice"), DROP your generic question list.
            - Instead, ask a follow-up specifically about THAT tool.
            - Focus on "Why" or "How" (e.g., "Why did you choose Redis over Memcached for that specific use case?").
+           - Candidate turns may end with a "[DETECTED TOOLS: ...]" line produced by our system (not the candidate). It lists the tools mentioned in THAT answer; "NEW" marks ones not discussed yet. Use it to pick the tool to follow up on (prefer NEW) instead of re-scanning earlier answers.
 
         --- CORE RULES ---
         - Ask ONE question at a time.
@@ -80,7 +293,35 @@ class InterviewManager:
         
         return base_prompt
 
-    def generate_response(self, user_input, role, difficulty, jd_text="", time_is_up=False):
+    def tool_hint(self, user_input, term_index):
+        """Compact Thread Follower hint listing tools detected in this answer."""
+        terms=term_index.find(user_input)
+        if not terms:
+            return ""
+        new=[t for t in terms if t not in self.discussed_terms]
+        self.discussed_terms.update(terms)
+        hint=f"\n[DETECTED TOOLS: {', '.join(terms)}"
+        if new:
+            hint+=f" | NEW: {', '.join(new)}"
+        return hint+"]"
+
+    def bank_hint(self, user_input, question_bank):
+        """Compact hint with a few retrieved questions the model can ask next, plus those questions."""
+        questions=question_bank.search(user_input, k=3, exclude=self.bank_suggested|self.bank_served)
+        if not questions:
+            return "", []
+        return f"\n[QUESTION BANK: {' | '.join(questions)}]", questions
+
+    def fallback_response(self, user_input, question_bank, started):
+        """Answers the turn from the local question bank when Gemini is down or too slow."""
+        first=not any(msg["role"]=="model" for msg in self.history)
+        question=question_bank.next_question(user_input, self.bank_served, first=first)
+        self.bank_served.add(question)
+        self.history.append({"role": "model", "parts": [question]})
+        self.turn_metrics.append({"latency_s": time.perf_counter()-started, "prompt_tokens": 0, "output_tokens": 0, "fallback": True})
+        return question
+
+    def generate_response(self, user_input, role, difficulty, jd_text="", time_is_up=False, term_index=None, question_bank=None):
         if not self.api_key:
             return "⚠️ Error: GEMINI_API_KEY not found."
 
@@ -96,28 +337,64 @@ class InterviewManager:
                 {"role": "user", "parts": [self.get_system_prompt(role, difficulty, jd_text)]}
             ]
 
+        answer=user_input
+        if term_index is not None and user_input:
+            user_input+=self.tool_hint(user_input, term_index)
         self.history.append({"role": "user", "parts": [user_input]})
+        # The bank hint only rides on this request; storing it would resend every old hint each turn
+        request=list(self.history)
+        suggested=[]
+        if question_bank is not None and len(self.history)>2:
+            hint, suggested=self.bank_hint(answer, question_bank)
+            request[-1]={"role": "user", "parts": [user_input+hint]}
 
         models=[ 'gemini-2.5-flash']
+        genai=load_genai(self.api_key)
+        scheduler=get_scheduler()
+        started=time.perf_counter()
         
         for model_name in models:
             try:
                 model=genai.GenerativeModel(model_name)
-                response=model.generate_content(self.history)
+                cancel=threading.Event()
+                call=lambda: scheduler.run(
+                    lambda: model.generate_content(request),
+                    priority=LLMScheduler.PRIORITY_TURN,
+                    timeout=self.latency_budget if question_bank is not None else None,
+                    cancel=cancel
+                )
+                # With a bank to fall back on, a slow call is abandoned (and pulled from the queue) instead of stalling the turn
+                response=_call_with_budget(call, self.latency_budget, cancel) if question_bank is not None else call()
                 if response.parts:
                     ai_text=response.text
+                    # Only questions the model actually saw count as suggested; the model rephrases, so track bank entries
+                    self.bank_suggested.update(suggested)
                     self.history.append({"role": "model", "parts": [ai_text]})
+                    self.turn_metrics.append(_call_metrics(response, started))
                     return ai_text
+            except SchedulerBusy:
+                if question_bank is not None:
+                    return self.fallback_response(answer, question_bank, started)
+                # Drop the unanswered turn so the candidate can simply repeat it
+                self.history.pop()
+                return "⏳ The interviewer is busy with other candidates. Please repeat your answer in a moment."
             except Exception as e:
                 continue
         
+        if question_bank is not None:
+            return self.fallback_response(answer, question_bank, started)
         return "⚠️ Trouble connecting. Check API Key."
     def reset_session(self):
         """Resets the chat session to start fresh."""
         self.chat=None
         self.history=[]
-    def end_interview(self):
-        """Forces the AI to generate the feedback JSON"""
+        self.discussed_terms=set()
+        self.bank_suggested=set()
+        self.bank_served=set()
+        self.turn_metrics=[]
+        self.report_metrics=None
+    def generate_feedback(self, delivery=None):
+        """Generates the feedback JSON from the history; raises on API or parse errors."""
         feedback_prompt="""
         Based on the conversation history, generate a structured JSON feedback report.
         Format:
@@ -130,18 +407,43 @@ class InterviewManager:
             "technical_rating": "Excellent/Good/Average/Poor"
         }
         """
+        # Delivery is measured locally from the recorded audio
+        if delivery:
+            feedback_prompt+=f"""
+        MEASURED DELIVERY METRICS (from audio): {json.dumps(delivery)}
+        Weigh these with the transcript when rating communication. Filler counts only include clear disfluencies and may be low.
+        """
         
+        genai=load_genai(self.api_key)
+        model=genai.GenerativeModel('gemini-2.5-flash')
+        feedback_history=self.history+[{"role": "user", "parts": [feedback_prompt]}]
+        # Reports yield to live turns and may wait longer for a slot
+        started=time.perf_counter()
+        response=get_scheduler().run(
+            lambda: model.generate_content(feedback_history),
+            priority=LLMScheduler.PRIORITY_REPORT,
+            timeout=get_scheduler().queue_timeout*4
+        )
+        
+        clean_json=response.text.replace("```json", "").replace("```", "").strip()
+        feedback=json.loads(clean_json)
+        self.report_metrics=_call_metrics(response, started)
+        if delivery:
+            feedback["delivery_metrics"]=delivery
+        return feedback
+
+    def end_interview(self, delivery=None):
+        """Forces the AI to generate the feedback JSON"""
         try:
-            model=genai.GenerativeModel('gemini-2.5-flash')
-            feedback_history=self.history+[{"role": "user", "parts": [feedback_prompt]}]
-            response=model.generate_content(feedback_history)
-            
-            clean_json=response.text.replace("```json", "").replace("```", "").strip()
-            return json.loads(clean_json)
-        except Exception:
-            return {
+            return self.generate_feedback(delivery)
+        except Exception as e:
+            feedback={
                 "score": 0,
+                "error": f"{type(e).__name__}: {e}", # Marks a fallback report (see analytics_store)
                 "feedback_summary": "Could not generate feedback.",
                 "strengths": ["N/A"],
                 "areas_for_improvement": ["N/A"]
-            }
\ No newline at end of file
+            }
+        if delivery:
+            feedback["delivery_metrics"]=delivery
+        return feedback
@@ -0,0 +1,191 @@
+import os
+import time
+import sqlite3
+import datetime
+
+SCHEMA="""
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    finished_at REAL NOT NULL,
+    date TEXT NOT NULL,
+    role TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'ok',
+    language TEXT,
+    duration_min REAL,
+    score INTEGER,
+    communication_rating TEXT,
+    technical_rating TEXT,
+    turns INTEGER,
+    avg_turn_latency_s REAL,
+    max_turn_latency_s REAL,
+    prompt_tokens INTEGER,
+    output_tokens INTEGER,
+    speaking_rate_wpm REAL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_date ON sessions(date);
+CREATE INDEX IF NOT EXISTS idx_sessions_role_date ON sessions(role, date);
+CREATE INDEX IF NOT EXISTS idx_sessions_difficulty_date ON sessions(difficulty, date);
+
+-- Per day/role/difficulty running sums, updated on every insert
+CREATE TABLE IF NOT EXISTS daily (
+    date TEXT NOT NULL,
+    role TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    sessions INTEGER NOT NULL,
+    score_sum INTEGER NOT NULL,
+    score_n INTEGER NOT NULL,
+    latency_sum REAL NOT NULL,
+    latency_n INTEGER NOT NULL,
+    tokens INTEGER NOT NULL,
+    turns INTEGER NOT NULL,
+    PRIMARY KEY (date, role, difficulty)
+);
+CREATE INDEX IF NOT EXISTS idx_daily_role_date ON daily(role, date);
+CREATE INDEX IF NOT EXISTS idx_daily_difficulty_date ON daily(difficulty, date);
+"""
+
+ROLLUP_SELECT="""
+    SELECT date, role, difficulty, COUNT(*),
+        COALESCE(SUM(score), 0), COUNT(score),
+        COALESCE(SUM(avg_turn_latency_s), 0), COUNT(avg_turn_latency_s),
+        COALESCE(SUM(prompt_tokens+output_tokens), 0), COALESCE(SUM(turns), 0)
+    FROM sessions
+"""
+
+ROLLUP_UPSERT="""
+    INSERT INTO daily VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(date, role, difficulty) DO UPDATE SET
+        sessions=sessions+excluded.sessions,
+        score_sum=score_sum+excluded.score_sum,
+        score_n=score_n+excluded.score_n,
+        latency_sum=latency_sum+excluded.latency_sum,
+        latency_n=latency_n+excluded.latency_n,
+        tokens=tokens+excluded.tokens,
+        turns=turns+excluded.turns
+"""
+
+# Aggregates every query returns, computed from the daily rollup
+AGGREGATES="""
+    SUM(sessions) AS sessions,
+    ROUND(SUM(score_sum)*1.0/NULLIF(SUM(score_n), 0), 2) AS avg_score,
+    ROUND(SUM(latency_sum)/NULLIF(SUM(latency_n), 0), 2) AS avg_turn_latency_s,
+    ROUND(SUM(tokens)*1.0/NULLIF(SUM(sessions), 0)) AS avg_tokens,
+    SUM(tokens) AS total_tokens,
+    ROUND(SUM(turns)*1.0/NULLIF(SUM(sessions), 0), 1) AS avg_turns
+"""
+
+class AnalyticsStore:
+    """SQLite store of finished-session metrics with indexed aggregate queries.
+
+    One row per session, indexed on date and on role/difficulty with date.
+    Dashboard queries read a daily rollup that is updated in the same
+    transaction as each insert. Their cost depends on days x roles x
+    difficulties, not on how many sessions are stored.
+    """
+    def __init__(self, path="analytics.db"):
+        self.path=path
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            columns={row[1] for row in conn.execute("PRAGMA table_info(sessions)")}
+            if "status" not in columns:
+                # Databases created before failed reports were tracked
+                conn.execute("ALTER TABLE sessions ADD COLUMN status TEXT NOT NULL DEFAULT 'ok'")
+            if not conn.execute("SELECT 1 FROM daily LIMIT 1").fetchone():
+                self._rebuild_rollup(conn)
+
+    def _rebuild_rollup(self, conn):
+        """Recomputes the daily rollup from the raw sessions (e.g. after a bulk import)."""
+        conn.execute("DELETE FROM daily")
+        conn.execute(f"INSERT INTO daily {ROLLUP_SELECT} GROUP BY date, role, difficulty")
+
+    @classmethod
+    def from_env(cls):
+        return cls(os.getenv("ANALYTICS_DB", "analytics.db"))
+
+    def _connect(self):
+        # A connection per call keeps the store safe to share across sessions/threads
+        return sqlite3.connect(self.path, timeout=10)
+
+    def record_session(self, settings, feedback, duration_min=None, turn_metrics=(), report_metrics=None):
+        """Appends one finished session.
+
+        A fallback report (feedback has "error") is stored with status
+        'failed' and a NULL score, so it never drags down average scores.
+        """
+        failed=bool(feedback.get("error"))
+        latencies=[t["latency_s"] for t in turn_metrics]
+        calls=list(turn_metrics)+([report_metrics] if report_metrics else [])
+        delivery=feedback.get("delivery_metrics") or {}
+        now=time.time()
+        row={
+            "finished_at": now,
+            "date": datetime.date.fromtimestamp(now).isoformat(),
+            "role": settings.get("role") or "General",
+            "difficulty": settings.get("difficulty") or "",
+            "status": "failed" if failed else "ok",
+            "language": settings.get("language"),
+            "duration_min": duration_min,
+            "score": None if failed else _to_int(feedback.get("score")),
+            "communication_rating": feedback.get("communication_rating"),
+            "technical_rating": feedback.get("technical_rating"),
+            "turns": len(latencies),
+            "avg_turn_latency_s": sum(latencies)/len(latencies) if latencies else None,
+            "max_turn_latency_s": max(latencies) if latencies else None,
+            "prompt_tokens": sum(c["prompt_tokens"] for c in calls),
+            "output_tokens": sum(c["output_tokens"] for c in calls),
+            "speaking_rate_wpm": delivery.get("speaking_rate_wpm"),
+        }
+        columns=", ".join(row)
+        placeholders=", ".join(f":{k}" for k in row)
+        with self._connect() as conn:
+            cur=conn.execute(f"INSERT INTO sessions ({columns}) VALUES ({placeholders})", row)
+            conn.execute(ROLLUP_UPSERT, conn.execute(f"{ROLLUP_SELECT} WHERE id = ?", (cur.lastrowid,)).fetchone())
+
+    def _where(self, role=None, difficulty=None, since=None):
+        clauses, params=[], []
+        if role:
+            clauses.append("role = ?")
+            params.append(role)
+        if difficulty:
+            clauses.append("difficulty = ?")
+            params.append(difficulty)
+        if since:
+            clauses.append("date >= ?")
+            params.append(since)
+        return (" WHERE "+" AND ".join(clauses) if clauses else ""), params
+
+    def _query(self, sql, params):
+        with self._connect() as conn:
+            conn.row_factory=sqlite3.Row
+            return [dict(r) for r in conn.execute(sql, params)]
+
+    def summary(self, role=None, difficulty=None, since=None):
+        """Overall aggregates for the filtered sessions."""
+        where, params=self._where(role, difficulty, since)
+        return self._query(f"SELECT {AGGREGATES} FROM daily{where}", params)[0]
+
+    def trend(self, role=None, difficulty=None, since=None):
+        """Aggregates per day, oldest first."""
+        where, params=self._where(role, difficulty, since)
+        return self._query(f"SELECT date, {AGGREGATES} FROM daily{where} GROUP BY date ORDER BY date", params)
+
+    def breakdown(self, by="role", role=None, difficulty=None, since=None):
+        """Aggregates grouped by role or difficulty."""
+        if by not in ("role", "difficulty"):
+            raise ValueError(f"Cannot group by {by!r}")
+        where, params=self._where(role, difficulty, since)
+        return self._query(f"SELECT {by}, {AGGREGATES} FROM daily{where} GROUP BY {by} ORDER BY sessions DESC", params)
+
+    def distinct(self, column):
+        """Distinct values of role/difficulty for filter widgets."""
+        if column not in ("role", "difficulty"):
+            raise ValueError(f"Unknown column {column!r}")
+        return [r[column] for r in self._query(f"SELECT DISTINCT {column} FROM daily ORDER BY {column}", [])]
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,121 @@
+import re
+import numpy as np
+
+FRAME_MS=30
+MIN_PAUSE_S=0.3
+LONG_PAUSE_S=1.0
+
+# Real disfluencies only. "like", "you know" and "i mean" count only when set
+# off as a clause of their own (", like," / "Like, ..."), never in "tools like
+# Kafka" or "I'd like to". Google ASR often drops "um"/"uh", so this undercounts.
+FILLER_PATTERN=re.compile(
+    r"\b(?:um+|uh+|erm+|hmm+|ah+)\b|(?:^|[,.!?;])\s*(?:like|you know|i mean)\s*(?=,)",
+    re.IGNORECASE,
+)
+# recognize_google returns unpunctuated text, where the pattern above can
+# hardly ever match; fillers are only counted when the transcript has punctuation
+_PUNCTUATION=re.compile(r"[,.!?;]")
+
+def count_fillers(transcript):
+    """Filler count for a transcript, or None when it has no punctuation to measure against."""
+    if not transcript or not _PUNCTUATION.search(transcript):
+        return None
+    return len(FILLER_PATTERN.findall(transcript))
+
+def analyze_answer(raw_data, sample_rate, sample_width, transcript):
+    """Computes delivery features for one spoken answer.
+
+    raw_data is the PCM captured by listen() (sr.AudioData.get_raw_data()).
+    Everything is vectorized over 30 ms frames, so a minute of audio takes a
+    few milliseconds.
+    """
+    dtype={1: np.int8, 2: np.int16, 4: np.int32}.get(sample_width, np.int16)
+    samples=np.frombuffer(raw_data, dtype=dtype).astype(np.float32)
+    duration=len(samples)/sample_rate if sample_rate else 0.0
+
+    words=len(transcript.split()) if transcript else 0
+    fillers=count_fillers(transcript)
+
+    frame_len=max(1, int(sample_rate*FRAME_MS/1000))
+    n_frames=len(samples)//frame_len
+    if n_frames==0:
+        return _features(duration, words, fillers, 0.0, np.empty(0), 0.0)
+
+    frames=samples[:n_frames*frame_len].reshape(n_frames, frame_len)
+    rms=np.sqrt(np.mean(frames**2, axis=1))
+
+    # Adaptive voice threshold: halfway (in dB) between noise floor and speech level
+    db=20*np.log10(rms+1e-9)
+    floor, peak=np.percentile(db, 10), np.percentile(db, 95)
+    voiced=db>(floor+peak)/2 if peak-floor>6 else np.ones(n_frames, dtype=bool)
+
+    # Silent runs between the first and last voiced frame are pauses
+    pauses=np.empty(0)
+    voiced_idx=np.flatnonzero(voiced)
+    if len(voiced_idx)>1:
+        inner=voiced[voiced_idx[0]:voiced_idx[-1]+1].astype(np.int8)
+        edges=np.diff(inner)
+        starts=np.flatnonzero(edges==-1)+1
+        ends=np.flatnonzero(edges==1)+1
+        pauses=(ends-starts)*FRAME_MS/1000
+        pauses=pauses[pauses>=MIN_PAUSE_S]
+
+    voiced_db=db[voiced]
+    energy_cv=float(np.std(voiced_db)/abs(np.mean(voiced_db))) if len(voiced_db) else 0.0
+    speaking_time=float(voiced.sum())*FRAME_MS/1000
+    return _features(duration, words, fillers, speaking_time, pauses, energy_cv)
+
+def _features(duration, words, fillers, speaking_time, pauses, energy_cv):
+    return {
+        "duration_s": round(duration, 2),
+        "words": words,
+        "speaking_rate_wpm": round(words/duration*60, 1) if duration else 0.0,
+        "speaking_time_s": round(speaking_time, 2),
+        "pause_count": int(len(pauses)),
+        "pause_total_s": round(float(pauses.sum()), 2),
+        "pause_mean_s": round(float(pauses.mean()), 2) if len(pauses) else 0.0,
+        "pause_max_s": round(float(pauses.max()), 2) if len(pauses) else 0.0,
+        "long_pauses": int((pauses>=LONG_PAUSE_S).sum()),
+        "energy_variation": round(energy_cv, 3),
+        "filler_count": fillers,
+    }
+
+def summarize_delivery(answers):
+    """Aggregates per-answer features into a compact summary with a deterministic rating."""
+    if not answers:
+        return None
+
+    duration=sum(a["duration_s"] for a in answers)
+    words=sum(a["words"] for a in answers)
+    # Only answers whose transcript could be measured count toward the filler rate
+    measured=[a for a in answers if a.get("filler_count") is not None]
+    fillers=sum(a["filler_count"] for a in measured)
+    filler_words=sum(a["words"] for a in measured)
+    pauses=sum(a["pause_count"] for a in answers)
+    long_pauses=sum(a["long_pauses"] for a in answers)
+
+    wpm=words/duration*60 if duration else 0.0
+    filler_rate=fillers/filler_words*100 if filler_words else None
+    long_pauses_per_min=long_pauses/duration*60 if duration else 0.0
+    energy=float(np.median([a["energy_variation"] for a in answers]))
+
+    # Start from 4 points and deduct for each delivery issue
+    points=4
+    if not 110<=wpm<=180: points-=1
+    if wpm and not 80<=wpm<=210: points-=1
+    if filler_rate is not None and filler_rate>3: points-=1
+    if long_pauses_per_min>4: points-=1
+    rating=["Poor", "Poor", "Average", "Good", "Excellent"][max(0, points)]
+
+    summary={
+        "answers": len(answers),
+        "speaking_rate_wpm": round(wpm, 1),
+        "pauses": pauses,
+        "long_pauses_per_min": round(long_pauses_per_min, 1),
+        "pause_mean_s": round(sum(a["pause_total_s"] for a in answers)/pauses, 2) if pauses else 0.0,
+        "energy_variation": round(energy, 3),
+        "rating": rating,
+    }
+    if filler_rate is not None:
+        summary["filler_per_100_words"]=round(filler_rate, 1)
+    return summary
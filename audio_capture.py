@@ -0,0 +1,136 @@
+import atexit
+import threading
+import time
+import numpy as np
+
+class AudioCapture:
+    """Keeps the microphone open and records into a fixed-size ring buffer.
+
+    A background thread reads the input device continuously and stores each
+    chunk with its RMS energy. listen() then only scans frames that are
+    already captured, so there is no device open or calibration per turn,
+    and speech that starts up to `preroll` seconds before the call is kept.
+    """
+    def __init__(self, seconds=120, sample_rate=16000, chunk=1024, energy_threshold=300, preroll=1.0, buffer=None):
+        self.sample_rate=sample_rate
+        self.chunk=chunk
+        self.sample_width=2 # sr.Microphone always records paInt16
+        self.energy_threshold=energy_threshold
+        self.preroll=preroll
+
+        # buffer lets the frames live in shared memory (see speech_worker.py)
+        self._n_chunks=len(buffer) if buffer is not None else ring_chunks(seconds, sample_rate, chunk)
+        self._buf=buffer if buffer is not None else np.zeros((self._n_chunks, chunk), dtype=np.int16)
+        self._energy=np.zeros(self._n_chunks, dtype=np.float32)
+        self._written=0
+        self._cond=threading.Condition()
+        self._stop=threading.Event()
+        self._thread=None
+        self._mic=None
+        self._sr=None
+
+    def _chunks(self, seconds):
+        return max(1, int(round(seconds*self.sample_rate/self.chunk)))
+
+    def start(self):
+        """Opens the input device once and starts the capture thread."""
+        import speech_recognition as sr
+        self._sr=sr
+        self._mic=sr.Microphone(sample_rate=self.sample_rate, chunk_size=self.chunk)
+        self._mic.__enter__()
+        self._thread=threading.Thread(target=self._run, name="audio-capture", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+        return self
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        if self._mic is not None:
+            try:
+                self._mic.__exit__(None, None, None)
+            except Exception:
+                pass
+            self._mic=None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                data=self._mic.stream.read(self.chunk)
+            except Exception:
+                time.sleep(0.05)
+                continue
+            samples=np.frombuffer(data, dtype=np.int16)[:self.chunk]
+            slot=self._written%self._n_chunks
+            self._buf[slot, :len(samples)]=samples
+            self._buf[slot, len(samples):]=0
+            self._energy[slot]=np.sqrt(np.mean(samples.astype(np.float32)**2)) if len(samples) else 0.0
+            with self._cond:
+                self._written+=1
+                self._cond.notify_all()
+
+    def listen(self, timeout=5, pause_threshold=3.0, phrase_time_limit=None):
+        """Returns the next phrase as sr.AudioData, or None if no speech starts within timeout."""
+        span=self.listen_range(timeout, pause_threshold, phrase_time_limit)
+        if span is None:
+            return None
+        return self._sr.AudioData(read_frames(self._buf, *span), self.sample_rate, self.sample_width)
+
+    def listen_range(self, timeout=5, pause_threshold=3.0, phrase_time_limit=None):
+        """Returns the next phrase as a (start, end) chunk range in the ring, or None.
+
+        Mirrors Recognizer.listen(): a phrase starts on the first chunk above
+        energy_threshold and ends after pause_threshold seconds of silence.
+        """
+        pause_chunks=self._chunks(pause_threshold)
+        pad=self._chunks(0.5)
+        limit=self._chunks(phrase_time_limit) if phrase_time_limit else None
+        deadline=time.monotonic()+timeout
+
+        with self._cond:
+            pos=max(0, self._written-self._chunks(self.preroll), self._written-self._n_chunks+1)
+        onset=None
+        last_voiced=None
+
+        while True:
+            with self._cond:
+                while self._written<=pos:
+                    if onset is None and time.monotonic()>deadline:
+                        return None
+                    if not self._cond.wait(timeout=1.0) and self._stop.is_set():
+                        return None
+                written=self._written
+
+            # Frames overwritten while we waited are gone; skip ahead
+            pos=max(pos, written-self._n_chunks+1)
+            energies=self._energy[np.arange(pos, written)%self._n_chunks]
+            voiced=np.flatnonzero(energies>self.energy_threshold)+pos
+
+            if onset is None:
+                if len(voiced)==0:
+                    pos=written
+                    if time.monotonic()>deadline:
+                        return None
+                    continue
+                onset=int(voiced[0])
+            if len(voiced):
+                last_voiced=int(voiced[-1])
+            pos=written
+
+            if written-last_voiced>pause_chunks:
+                break
+            if limit is not None and written-onset>=limit:
+                break
+
+        start=max(onset-pad, written-self._n_chunks+1, 0)
+        end=min(last_voiced+1+pad, written)
+        return start, end
+
+def ring_chunks(seconds, sample_rate=16000, chunk=1024):
+    """Number of chunks a ring needs to hold `seconds` of audio."""
+    return max(2, int(seconds*sample_rate/chunk))
+
+def read_frames(buffer, start, end):
+    """PCM bytes for absolute chunks [start, end) of a ring buffer."""
+    return buffer[np.arange(start, end)%len(buffer)].tobytes()
@@ -0,0 +1,184 @@
+"""Batch offline evaluation of recorded interviews.
+
+Reads every *.jsonl file in a directory (one interview per line) and runs the
+same feedback generation as end_interview() across them with a bounded pool.
+Results are appended to an output JSONL as they finish, which doubles as the
+checkpoint: re-running the same command skips interviews already scored.
+
+Each input line is a JSON object with either Gemini-style "history"
+([{"role": "user"|"model", "parts": [...]}]) or UI-style "messages"
+([{"role": "user"|"ai", "content": ...}]), plus optional "session_id",
+"role", "difficulty", "jd_text" and "delivery" (see audio_analytics.py).
+
+Usage:
+    python batch_eval.py transcripts/ -o reports.jsonl --workers 8 --retries 3
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from agent import InterviewManager
+
+def iter_transcripts(directory, skip=()):
+    """Yields (session_id, record) lazily, one line at a time."""
+    skip={os.path.abspath(p) for p in skip}
+    for path in sorted(glob.glob(os.path.join(directory, "*.jsonl"))):
+        if os.path.abspath(path) in skip:
+            continue # The output file may live in the input directory
+        name=os.path.basename(path)
+        with open(path, encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                line=line.strip()
+                if not line:
+                    continue
+                try:
+                    record=json.loads(line)
+                except ValueError as e:
+                    yield f"{name}:{line_no}", {"_error": f"Invalid JSON: {e}"}
+                    continue
+                if not isinstance(record, dict):
+                    yield f"{name}:{line_no}", {"_error": "Record is not a JSON object"}
+                    continue
+                yield str(record.get("session_id") or f"{name}:{line_no}"), record
+
+def load_checkpoint(output_path):
+    """Session ids that already have a successful result in the output file."""
+    done=set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                result=json.loads(line)
+            except ValueError:
+                continue # Partial line from an interrupted run
+            if result.get("status")=="ok":
+                done.add(result["session_id"])
+    return done
+
+def validate(record):
+    """Returns why a record can't be scored, or None if it looks well-formed."""
+    if "_error" in record:
+        return record["_error"]
+    history, messages=record.get("history"), record.get("messages")
+    if history is not None:
+        if not isinstance(history, list) or not all(
+                isinstance(m, dict) and isinstance(m.get("role"), str) and isinstance(m.get("parts"), list) for m in history):
+            return "'history' must be a list of {role, parts} objects"
+    if messages is not None:
+        if not isinstance(messages, list) or not all(isinstance(m, dict) and isinstance(m.get("content", ""), str) for m in messages):
+            return "'messages' must be a list of {role, content} objects"
+    for key in ("role", "difficulty", "jd_text"):
+        if record.get(key) is not None and not isinstance(record[key], str):
+            return f"'{key}' must be a string"
+    if record.get("delivery") is not None and not isinstance(record["delivery"], dict):
+        return "'delivery' must be an object"
+    return None
+
+def to_history(manager, record):
+    """Builds the Gemini history end_interview() expects from a transcript record."""
+    if record.get("history"):
+        return record["history"]
+
+    history=[]
+    if record.get("role"):
+        prompt=manager.get_system_prompt(record["role"], record.get("difficulty", "Mid-Level"), record.get("jd_text", ""))
+        history.append({"role": "user", "parts": [prompt]})
+    for msg in record.get("messages", []):
+        role="model" if msg.get("role") in ("ai", "model") else "user"
+        history.append({"role": role, "parts": [msg.get("content", "")]})
+    return history
+
+def evaluate(session_id, record, retries):
+    """Scores one interview, retrying failed attempts with exponential backoff."""
+    started=time.perf_counter()
+    problem=validate(record)
+    if problem:
+        return {"session_id": session_id, "status": "error", "error": problem, "attempts": 0}
+
+    manager=InterviewManager()
+    try:
+        manager.history=to_history(manager, record)
+    except Exception as e:
+        return {"session_id": session_id, "status": "error", "error": f"Bad transcript: {type(e).__name__}: {e}", "attempts": 0}
+    if not manager.history:
+        return {"session_id": session_id, "status": "error", "error": "Empty transcript", "attempts": 0}
+
+    error=None
+    for attempt in range(1, retries+2):
+        try:
+            feedback=manager.generate_feedback(record.get("delivery"))
+            return {
+                "session_id": session_id,
+                "status": "ok",
+                "attempts": attempt,
+                "latency_s": round(time.perf_counter()-started, 2),
+                "feedback": feedback,
+            }
+        except Exception as e:
+            error=f"{type(e).__name__}: {e}"
+            if attempt<=retries:
+                time.sleep(min(30, 2**attempt))
+    return {"session_id": session_id, "status": "error", "error": error, "attempts": retries+1}
+
+def run(directory, output_path, workers, retries):
+    done=load_checkpoint(output_path)
+    counts={"ok": 0, "error": 0, "skipped": 0}
+    started=time.perf_counter()
+
+    with open(output_path, "a", encoding="utf-8") as out, ThreadPoolExecutor(max_workers=workers) as pool:
+        pending={} # future -> session id
+
+        def drain():
+            """Writes results as they finish and returns the futures still running."""
+            finished, _=wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                session_id=pending.pop(future)
+                try:
+                    result=future.result()
+                except Exception as e:
+                    # Never let one record stop the batch
+                    result={"session_id": session_id, "status": "error", "error": f"{type(e).__name__}: {e}", "attempts": 0}
+                out.write(json.dumps(result)+"\n")
+                out.flush()
+                counts[result["status"]]+=1
+                total=counts["ok"]+counts["error"]
+                if total%50==0:
+                    rate=total/(time.perf_counter()-started)
+                    print(f"  {total} scored ({counts['error']} failed), {rate:.1f}/s", flush=True)
+            return pending
+
+        for session_id, record in iter_transcripts(directory, skip=[output_path]):
+            if session_id in done:
+                counts["skipped"]+=1
+                continue
+            # Keep only a small window in flight so huge inputs stay streaming
+            while len(pending)>=workers*2:
+                pending=drain()
+            pending[pool.submit(evaluate, session_id, record, retries)]=session_id
+        while pending:
+            pending=drain()
+
+    elapsed=time.perf_counter()-started
+    print(f"Done in {elapsed:.1f}s: {counts['ok']} ok, {counts['error']} failed, {counts['skipped']} already scored.")
+    return counts
+
+def main(argv=None):
+    parser=argparse.ArgumentParser(description="Regenerate feedback reports for archived interview transcripts.")
+    parser.add_argument("directory", help="Directory containing *.jsonl transcripts")
+    parser.add_argument("-o", "--output", default="reports.jsonl", help="Results file (also the resume checkpoint)")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent feedback generations")
+    parser.add_argument("--retries", type=int, default=3, help="Retries per interview after a failure")
+    args=parser.parse_args(argv)
+
+    if not os.path.isdir(args.directory):
+        parser.error(f"Not a directory: {args.directory}")
+    counts=run(args.directory, args.output, args.workers, args.retries)
+    return 1 if counts["error"] else 0
+
+if __name__=="__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""Import-time profile for Manager.py cold starts.
+
+Runs the config page once in a fresh interpreter with `python -X importtime`
+and reports time-to-first-paint, the slowest imports, and whether any of the
+heavy dependencies were loaded before they were needed.
+
+Usage:
+    python import_profile.py --top 15
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+APP_FILE=os.path.join(os.path.dirname(os.path.abspath(__file__)), "Manager.py")
+
+# Should not be imported until an upload (parsers) or the interview page (voice, LLM)
+HEAVY_MODULES=["speech_recognition", "pyttsx3", "pypdf", "docx", "google.generativeai", "numpy", "audio_analytics", "speech_worker"]
+
+CHILD_SCRIPT="""
+import time
+from streamlit.testing.v1 import AppTest
+start=time.perf_counter()
+AppTest.from_file({app!r}, default_timeout=120).run()
+print("FIRST_PAINT", time.perf_counter()-start)
+"""
+
+def parse_importtime(stderr):
+    """Returns {module: cumulative_us} from `-X importtime` output."""
+    times={}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        try:
+            _, cumulative, name=line[len("import time:"):].split("|")
+            times[name.strip()]=int(cumulative)
+        except ValueError:
+            continue
+    return times
+
+def profile():
+    proc=subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD_SCRIPT.format(app=APP_FILE)],
+        capture_output=True, text=True, cwd=os.path.dirname(APP_FILE),
+    )
+    first_paint=None
+    for line in proc.stdout.splitlines():
+        if line.startswith("FIRST_PAINT"):
+            first_paint=float(line.split()[1])
+    if first_paint is None:
+        raise RuntimeError(f"Profile run failed:\n{proc.stderr[-2000:]}")
+    return first_paint, parse_importtime(proc.stderr)
+
+def main(argv=None):
+    parser=argparse.ArgumentParser(description="Profile Manager.py import time and time-to-first-paint.")
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest top-level imports to list")
+    args=parser.parse_args(argv)
+
+    first_paint, times=profile()
+    print(f"Time to first paint (config page): {first_paint*1000:.0f} ms\n")
+
+    top_level={name: us for name, us in times.items() if "." not in name}
+    print("Slowest top-level imports:")
+    for name, us in sorted(top_level.items(), key=lambda kv: -kv[1])[:args.top]:
+        print(f"  {us/1000:9.1f} ms  {name}")
+
+    print("\nHeavy dependencies on the config page:")
+    for name in HEAVY_MODULES:
+        status=f"LOADED ({times[name]/1000:.1f} ms)" if name in times else "deferred"
+        print(f"  {name:22} {status}")
+
+if __name__=="__main__":
+    main()
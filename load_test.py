@@ -0,0 +1,371 @@
+"""Concurrent multi-session load harness for Manager.py.
+
+Spins up N simulated candidates with Streamlit's AppTest, each driving
+config -> interview -> feedback with the microphone, TTS and Gemini stubbed,
+and reports how the server process copes as N grows.
+
+Usage:
+    python load_test.py --sessions 1 2 4 8 16 --turns 3 --plot load_test.png
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+APP_FILE=os.path.join(os.path.dirname(os.path.abspath(__file__)), "Manager.py")
+PROBE_KEY="_load_probe"
+
+# Scripted candidate answers. The last turn always says "end interview" so
+# the app routes itself to the feedback page.
+ANSWERS=[
+    "I have been building backend services in Python with Redis and Postgres for four years.",
+    "I chose Redis because we needed sub-millisecond reads for the session cache.",
+    "We sharded by tenant id and used read replicas for the reporting queries.",
+    "I would add circuit breakers and retries with jitter around the payment provider.",
+]
+
+# --- Stubs ---
+
+def _probe():
+    """Returns the per-session metrics dict stored in the calling session's state."""
+    import streamlit as st
+    try:
+        return st.session_state[PROBE_KEY]
+    except Exception:
+        return None
+
+class _FakeAudioData:
+    def __init__(self, frame_data, sample_rate, sample_width):
+        self.frame_data=frame_data
+        self.sample_rate=sample_rate
+        self.sample_width=sample_width
+
+    def get_raw_data(self):
+        return self.frame_data
+
+class _FakeStream:
+    """Real-time synthetic mic: answer_seconds of tone, then a pause long enough to end the phrase."""
+    config={"answer_seconds": 3.0, "pause_seconds": 3.5}
+
+    def __init__(self, sample_rate):
+        self.sample_rate=sample_rate
+        self.t=0
+
+    def read(self, n):
+        import numpy as np
+        time.sleep(n/self.sample_rate)
+        t=(self.t+np.arange(n))/self.sample_rate
+        self.t+=n
+        cycle=self.config["answer_seconds"]+self.config["pause_seconds"]
+        talking=(t%cycle)<self.config["answer_seconds"]
+        return (8000*talking*np.sin(2*np.pi*220*t)).astype(np.int16).tobytes()
+
+class _FakeMicrophone:
+    def __init__(self, device_index=None, sample_rate=16000, chunk_size=1024):
+        self.sample_rate=sample_rate
+        self.stream=None
+
+    def __enter__(self):
+        self.stream=_FakeStream(self.sample_rate)
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+class _FakeRecognizer:
+    config={"turns": 3}
+
+    def recognize_google(self, audio):
+        probe=_probe()
+        if probe is None:
+            return ANSWERS[0]
+        turn=len(probe["answers_at"])
+        probe["answers_at"].append(time.perf_counter())
+        if turn>=self.config["turns"]:
+            return "I think that covers it, end interview please."
+        return ANSWERS[turn%len(ANSWERS)]
+
+class _FakeEngine:
+    def setProperty(self, name, value):
+        pass
+
+    def say(self, text):
+        pass
+
+    def runAndWait(self):
+        pass
+
+class _FakeResponse:
+    def __init__(self, text):
+        self.text=text
+        self.parts=[text]
+
+class _FakeModel:
+    config={"llm_seconds": 0.5}
+
+    def __init__(self, model_name):
+        self.model_name=model_name
+
+    def generate_content(self, history):
+        time.sleep(self.config["llm_seconds"])
+        prompt=history[-1]["parts"][0]
+        if "JSON feedback report" in prompt:
+            text=('{"score": 7, "feedback_summary": "Load test report.", '
+                  '"strengths": ["Clear"], "areas_for_improvement": ["Depth"], '
+                  '"communication_rating": "Good", "technical_rating": "Good"}')
+        else:
+            text="Why did you choose that approach?"
+        return _FakeResponse(text)
+
+def install_voice_stubs():
+    """Replaces the microphone and TTS modules; also runs inside the speech worker process."""
+    sr=types.ModuleType("speech_recognition")
+    sr.Recognizer=_FakeRecognizer
+    sr.Microphone=_FakeMicrophone
+    sr.AudioData=_FakeAudioData
+    sr.WaitTimeoutError=type("WaitTimeoutError", (Exception,), {})
+    _FakeStream.config.update(answer_seconds=float(os.getenv("LOAD_TEST_ANSWER_SECONDS", "3")))
+    sys.modules["speech_recognition"]=sr
+
+    tts=types.ModuleType("pyttsx3")
+    tts.init=lambda *a, **k: _FakeEngine()
+    sys.modules["pyttsx3"]=tts
+
+def install_stubs(answer_seconds, llm_seconds, turns, rpm):
+    """Replaces the microphone, TTS and Gemini modules with in-process fakes."""
+    os.environ["LOAD_TEST_ANSWER_SECONDS"]=str(answer_seconds)
+    os.environ["SPEECH_WORKER_SETUP"]="load_test:install_voice_stubs"
+    install_voice_stubs()
+    _FakeRecognizer.config.update(turns=turns)
+
+    genai=types.ModuleType("google.generativeai")
+    genai.configure=lambda **k: None
+    genai.GenerativeModel=_FakeModel
+    _FakeModel.config.update(llm_seconds=llm_seconds)
+    sys.modules["google.generativeai"]=genai
+    os.environ.setdefault("GEMINI_API_KEY", "load-test")
+    os.environ["GEMINI_RPM"]=str(rpm)
+    # Keep simulated sessions out of the real analytics store
+    os.environ.setdefault("ANALYTICS_DB", os.path.join(tempfile.gettempdir(), "load_test_analytics.db"))
+
+    # Count every script execution (including st.rerun loops) per session
+    import streamlit as st
+    original=st.set_page_config
+    if not getattr(original, "_load_counted", False):
+        def counted(*args, **kwargs):
+            probe=_probe()
+            if probe is not None:
+                probe["runs"]+=1
+            return original(*args, **kwargs)
+        counted._load_counted=True
+        st.set_page_config=counted
+
+    # Time each answered turn as the candidate sees it, including question-bank fallbacks
+    from agent import InterviewManager
+    generate=InterviewManager.generate_response
+    if not getattr(generate, "_load_timed", False):
+        def timed(self, user_input, *args, **kwargs):
+            reply=generate(self, user_input, *args, **kwargs)
+            probe=_probe()
+            if probe is not None and probe["answers_at"] and user_input:
+                probe["turn_latency"].append(time.perf_counter()-probe["answers_at"][-1])
+                if self.turn_metrics and self.turn_metrics[-1].get("fallback"):
+                    probe["fallbacks"]+=1
+            return reply
+        timed._load_timed=True
+        InterviewManager.generate_response=timed
+
+def share_runtime():
+    """Keeps one Runtime for the whole process, like a real server.
+
+    AppTest installs a mock Runtime at the start of every run and clears it
+    at the end, which breaks any other session still running in parallel.
+    """
+    from streamlit.runtime import Runtime
+    from streamlit.testing.v1 import app_test
+
+    class _PinnedMeta(type):
+        def __setattr__(cls, name, value):
+            if name=="_instance":
+                if Runtime._instance is None and value is not None:
+                    Runtime._instance=value
+                return
+            super().__setattr__(name, value)
+
+    app_test.Runtime=_PinnedMeta("Runtime", (Runtime,), {})
+
+_WORKERS=[]
+
+def track_speech_workers():
+    """Records SpeechWorker instances so their IPC stats can be reported per level."""
+    import speech_worker
+    init=speech_worker.SpeechWorker.__init__
+    if getattr(init, "_load_tracked", False):
+        return
+    def tracked(self, *args, **kwargs):
+        init(self, *args, **kwargs)
+        _WORKERS.append(self)
+    tracked._load_tracked=True
+    speech_worker.SpeechWorker.__init__=tracked
+
+# --- Session driver ---
+
+def _click(at, prefix, timeout):
+    button=next(b for b in at.button if b.label.startswith(prefix))
+    button.click().run(timeout=timeout)
+
+def run_session(timeout):
+    """Drives one candidate through config -> interview -> feedback."""
+    from streamlit.testing.v1 import AppTest
+
+    probe={"runs": 0, "answers_at": [], "turn_latency": [], "fallbacks": 0, "error": None}
+    at=AppTest.from_file(APP_FILE, default_timeout=timeout)
+    at.session_state[PROBE_KEY]=probe
+    try:
+        at.run()
+        _click(at, "🚀", timeout)
+        # Auto mode keeps rerunning inside this single run until feedback
+        _click(at, "▶️ Begin", timeout)
+        if at.session_state["page"]!="feedback":
+            probe["error"]=f"ended on page {at.session_state['page']!r}"
+    except Exception as e:
+        probe["error"]=str(e)
+    return at, probe
+
+def _rss_bytes():
+    """Current resident set size, falling back to peak RSS off Linux."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1])*os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss*1024
+
+def run_level(n, timeout):
+    """Runs n concurrent sessions and returns aggregate metrics."""
+    from agent import get_scheduler
+    get_scheduler.cache_clear() # Fresh scheduler so queue stats cover this level only
+    for worker in _WORKERS:
+        worker.reset_stats()
+    base_mem=_rss_bytes()
+    cpu_start=time.process_time()
+    wall_start=time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=n) as pool:
+        results=list(pool.map(lambda _: run_session(timeout), range(n)))
+
+    wall=time.perf_counter()-wall_start
+    cpu=time.process_time()-cpu_start
+    # Sessions are still referenced here, so this is what they retain
+    retained=max(0, _rss_bytes()-base_mem)
+
+    scheduler=get_scheduler().stats()
+    speech=[w.stats() for w in _WORKERS]
+    probes=[p for _, p in results]
+    runs=sum(p["runs"] for p in probes)
+    latencies=sorted(l for p in probes for l in p["turn_latency"])
+    return {
+        "sessions": n,
+        "errors": sum(1 for p in probes if p["error"]),
+        "wall_s": wall,
+        "cpu_s": cpu,
+        "cpu_per_run_ms": (cpu/runs*1000) if runs else 0.0,
+        "runs": runs,
+        "rerun_rate": runs/wall if wall else 0.0,
+        "mem_per_session_kb": retained/n/1024,
+        "turn_p50_s": statistics.median(latencies) if latencies else 0.0,
+        "turn_p95_s": latencies[int(0.95*(len(latencies)-1))] if latencies else 0.0,
+        "fallbacks": sum(p["fallbacks"] for p in probes),
+        "llm_queue_max": scheduler["max_queue_depth"],
+        "llm_wait_avg_s": scheduler["avg_wait_s"],
+        "llm_wait_max_s": scheduler["max_wait_s"],
+        "speak_ipc_p95_ms": max((w["speak"]["ipc_p95_ms"] for w in speech if "speak" in w), default=0.0),
+        "listen_ipc_p95_ms": max((w["listen"]["ipc_p95_ms"] for w in speech if "listen" in w), default=0.0),
+        "worker_restarts": sum(w["restarts"] for w in speech),
+    }
+
+# --- Reporting ---
+
+COLUMNS=[
+    ("sessions", "N", "{:d}"),
+    ("errors", "err", "{:d}"),
+    ("wall_s", "wall s", "{:.1f}"),
+    ("cpu_s", "cpu s", "{:.2f}"),
+    ("cpu_per_run_ms", "cpu/run ms", "{:.2f}"),
+    ("rerun_rate", "runs/s", "{:.1f}"),
+    ("mem_per_session_kb", "KB/session", "{:.0f}"),
+    ("turn_p50_s", "turn p50 s", "{:.3f}"),
+    ("turn_p95_s", "turn p95 s", "{:.3f}"),
+    ("fallbacks", "fallbacks", "{:d}"),
+    ("llm_queue_max", "llm queue", "{:d}"),
+    ("llm_wait_avg_s", "llm wait s", "{:.3f}"),
+    ("llm_wait_max_s", "llm wait max", "{:.3f}"),
+    ("speak_ipc_p95_ms", "speak ipc ms", "{:.2f}"),
+    ("listen_ipc_p95_ms", "listen ipc ms", "{:.2f}"),
+    ("worker_restarts", "restarts", "{:d}"),
+]
+
+def print_table(rows):
+    print("  ".join(f"{label:>11}" for _, label, _ in COLUMNS))
+    for row in rows:
+        print("  ".join(f"{fmt.format(row[key]):>11}" for key, _, fmt in COLUMNS))
+
+def plot(rows, path):
+    try:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("matplotlib not installed, skipping plot")
+        return
+
+    xs=[r["sessions"] for r in rows]
+    panels=[
+        ("cpu_per_run_ms", "Script-run CPU (ms/run)"),
+        ("rerun_rate", "Rerun rate (runs/s)"),
+        ("mem_per_session_kb", "Memory per session (KB)"),
+        ("turn_p95_s", "Turn latency p95 (s)"),
+    ]
+    fig, axes=plt.subplots(2, 2, figsize=(10, 7))
+    for ax, (key, title) in zip(axes.flat, panels):
+        ax.plot(xs, [r[key] for r in rows], marker="o")
+        ax.set_title(title)
+        ax.set_xlabel("Concurrent sessions")
+        ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+    fig.savefig(path)
+    print(f"Plot saved to {path}")
+
+def main(argv=None):
+    parser=argparse.ArgumentParser(description="Load test Manager.py with N simulated candidates.")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8], help="Concurrency levels to run")
+    parser.add_argument("--turns", type=int, default=3, help="Answers per candidate before ending")
+    parser.add_argument("--answer-seconds", type=float, default=3.0, help="Simulated speaking time per answer")
+    parser.add_argument("--llm-seconds", type=float, default=0.5, help="Simulated Gemini latency")
+    parser.add_argument("--rpm", type=int, default=6000, help="Quota for the shared LLM scheduler (requests/minute)")
+    parser.add_argument("--timeout", type=float, default=600, help="Per-session AppTest timeout (seconds)")
+    parser.add_argument("--plot", default=None, help="Write a PNG of the metrics to this path")
+    args=parser.parse_args(argv)
+
+    install_stubs(args.answer_seconds, args.llm_seconds, args.turns, args.rpm)
+    track_speech_workers()
+    share_runtime()
+
+    # Warm-up run so module imports don't count against the first level
+    print("Warming up...", flush=True)
+    run_session(args.timeout)
+
+    rows=[]
+    for n in args.sessions:
+        print(f"Running {n} concurrent session(s)...", flush=True)
+        rows.append(run_level(n, args.timeout))
+    print_table(rows)
+    if args.plot:
+        plot(rows, args.plot)
+
+if __name__=="__main__":
+    main()
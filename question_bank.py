@@ -0,0 +1,453 @@
+import re
+import math
+from collections import Counter
+
+from term_index import extract_terms
+
+# Complexity levels from the config page, grouped into question tiers
+LEVELS={"Intern": "entry", "Junior": "entry", "Mid-Level": "mid", "Senior": "senior", "Executive": "senior"}
+# Each tier also draws on the tier below it, after its own questions
+TIERS={"entry": ["entry"], "mid": ["mid", "entry"], "senior": ["senior", "mid"]}
+
+# Vetted questions per role (the role_options on the config page) and tier.
+QUESTIONS={
+    "Software Engineer": {
+        "entry": [
+            "Walk me through a project where you wrote most of the code yourself. What would you structure differently today?",
+            "How do you approach debugging a bug you cannot reproduce locally?",
+            "What is the difference between a process and a thread, and when would you use each?",
+        ],
+        "mid": [
+            "Describe how you would design a REST API for a feature you recently built. How did you handle versioning and errors?",
+            "Tell me about a performance problem you diagnosed in production. How did you find the root cause?",
+            "How do you decide what to cover with unit tests versus integration tests?",
+        ],
+        "senior": [
+            "How would you design a system that has to handle ten times today's traffic? Where would it break first?",
+            "Tell me about a technical decision you pushed back on. How did you make the case?",
+            "How do you keep a large codebase maintainable as the team grows?",
+        ],
+    },
+    "Product Manager": {
+        "entry": [
+            "Pick a product you use daily. What one feature would you change, and how would you measure success?",
+            "How would you gather requirements from users who disagree with each other?",
+            "What is the difference between an output and an outcome in product work?",
+        ],
+        "mid": [
+            "Walk me through how you prioritized a roadmap with more requests than capacity.",
+            "Tell me about a launch that missed its goals. What did the data tell you, and what did you change?",
+            "How do you write a spec that engineering and design can both act on?",
+        ],
+        "senior": [
+            "How do you set product strategy when leadership and customers want different things?",
+            "Tell me about a time you killed a feature or product. How did you decide and communicate it?",
+            "How do you align several teams around one product vision?",
+        ],
+    },
+    "Data Scientist": {
+        "entry": [
+            "Explain the bias-variance tradeoff with an example from a model you built.",
+            "How do you handle missing values and outliers before training a model?",
+            "Which evaluation metric would you choose for an imbalanced classification problem, and why?",
+        ],
+        "mid": [
+            "Walk me through an A/B test you designed. How did you choose the sample size and guard against peeking?",
+            "Tell me about a model that performed well offline but poorly in production. What happened?",
+            "How do you explain a model's predictions to a non-technical stakeholder?",
+        ],
+        "senior": [
+            "How would you build a data science roadmap for a team that has no ML in production yet?",
+            "How do you monitor models for drift, and what triggers a retrain?",
+            "Tell me about a time your analysis changed a major business decision.",
+        ],
+    },
+    "Marketing Specialist": {
+        "entry": [
+            "Tell me about a campaign you admired recently. Why did it work?",
+            "How would you measure whether a social media post was successful?",
+            "How do you define a target audience for a new product?",
+        ],
+        "mid": [
+            "Walk me through a campaign you ran end to end. What were the results against your goals?",
+            "How do you split a limited budget across channels?",
+            "Tell me about an experiment that changed how you market a product.",
+        ],
+        "senior": [
+            "How do you build a go-to-market plan for a new segment?",
+            "How do you prove marketing's contribution to revenue to the leadership team?",
+            "Tell me about a brand repositioning you led. How did you measure its impact?",
+        ],
+    },
+    "Sales Representative": {
+        "entry": [
+            "How do you prepare for a first call with a prospect you know little about?",
+            "Tell me about a time you turned a no into a yes.",
+            "How do you handle a prospect who says your product is too expensive?",
+        ],
+        "mid": [
+            "Walk me through your pipeline management. How do you decide which deals to focus on?",
+            "Tell me about the largest deal you closed. What made it work?",
+            "How do you qualify a lead, and which framework do you use?",
+        ],
+        "senior": [
+            "How do you build and run a territory plan for a new market?",
+            "Tell me about a strategic account you grew over several years.",
+            "How do you forecast accurately, and what do you do when a forecast slips?",
+        ],
+    },
+    "HR Manager": {
+        "entry": [
+            "How would you handle an employee who comes to you with a confidential complaint?",
+            "What makes an onboarding process effective?",
+            "How do you stay current with employment law and policy changes?",
+        ],
+        "mid": [
+            "Tell me about a difficult employee relations case you resolved.",
+            "How do you design a fair performance review process?",
+            "How have you used data to improve hiring or retention?",
+        ],
+        "senior": [
+            "How would you build an HR strategy that supports rapid company growth?",
+            "Tell me about a change management initiative you led across the organization.",
+            "How do you shape company culture during a restructuring?",
+        ],
+    },
+    "Financial Analyst": {
+        "entry": [
+            "Walk me through the three financial statements and how they connect.",
+            "How would you build a simple revenue forecast for a new product?",
+            "What is working capital, and why does it matter?",
+        ],
+        "mid": [
+            "Tell me about a financial model you built. Which assumptions drove the result most?",
+            "How do you run a variance analysis when actuals miss budget?",
+            "How would you value a company, and when would you prefer DCF over comparables?",
+        ],
+        "senior": [
+            "How do you present a capital allocation recommendation to executives?",
+            "Tell me about a time your analysis changed an investment decision.",
+            "How do you build a planning process that a whole business unit trusts?",
+        ],
+    },
+    "Graphic Designer": {
+        "entry": [
+            "Walk me through a project in your portfolio from brief to final design.",
+            "How do you choose typography and color for a new brand?",
+            "How do you respond to feedback you disagree with?",
+        ],
+        "mid": [
+            "Tell me about a design system or brand guideline you created or maintained.",
+            "How do you balance creativity with strict brand constraints?",
+            "How do you manage several projects with competing deadlines?",
+        ],
+        "senior": [
+            "How do you set the creative direction for a team of designers?",
+            "Tell me about a rebrand you led. How did you get stakeholders on board?",
+            "How do you measure whether a design is effective?",
+        ],
+    },
+    "Project Manager": {
+        "entry": [
+            "How do you break a project down into tasks and estimate them?",
+            "What would you do if a team member keeps missing deadlines?",
+            "Which project management tools have you used, and how?",
+        ],
+        "mid": [
+            "Tell me about a project that went off track. How did you recover it?",
+            "How do you manage scope creep with a demanding stakeholder?",
+            "How do you choose between Agile and Waterfall for a project?",
+        ],
+        "senior": [
+            "How do you run a portfolio of projects with shared resources?",
+            "Tell me about the most complex project you delivered. What made it complex?",
+            "How do you report project risk to executives?",
+        ],
+    },
+    "Customer Support Specialist": {
+        "entry": [
+            "How would you calm down an angry customer?",
+            "Tell me about a time you went beyond what was expected for a customer.",
+            "How do you handle a question you don't know the answer to?",
+        ],
+        "mid": [
+            "How do you prioritize a queue with urgent and routine tickets?",
+            "Tell me about feedback from customers that you turned into a product improvement.",
+            "Which support metrics matter most to you, and why?",
+        ],
+        "senior": [
+            "How would you scale a support team while keeping satisfaction high?",
+            "How do you design escalation paths and SLAs?",
+            "Tell me about a support process you redesigned. What was the impact?",
+        ],
+    },
+    "Business Analyst": {
+        "entry": [
+            "How do you gather and document requirements from stakeholders?",
+            "Tell me about a time you used data to answer a business question.",
+            "What is the difference between functional and non-functional requirements?",
+        ],
+        "mid": [
+            "Walk me through a process you mapped and improved.",
+            "How do you handle stakeholders with conflicting requirements?",
+            "How do you validate that a delivered solution meets the business need?",
+        ],
+        "senior": [
+            "How do you build a business case for a major system change?",
+            "Tell me about an analysis that shaped company strategy.",
+            "How do you set up business analysis practices across several teams?",
+        ],
+    },
+    "DevOps Engineer": {
+        "entry": [
+            "Explain what a CI/CD pipeline does and describe one you have worked with.",
+            "What is the difference between a container and a virtual machine?",
+            "How would you troubleshoot a service that fails to start after a deploy?",
+        ],
+        "mid": [
+            "How do you manage infrastructure as code, and how do you review changes safely?",
+            "Tell me about an incident you handled. What did the postmortem change?",
+            "How do you design monitoring and alerting so on-call is not flooded with noise?",
+        ],
+        "senior": [
+            "How would you move a monolith deployment to Kubernetes with zero downtime?",
+            "How do you balance deployment speed with reliability across many teams?",
+            "How do you plan for disaster recovery, and how do you test it?",
+        ],
+    },
+    "Content Writer": {
+        "entry": [
+            "How do you research a topic you know nothing about?",
+            "Walk me through your editing process for a draft.",
+            "How do you adapt your tone for different audiences?",
+        ],
+        "mid": [
+            "Tell me about a piece of content that performed well. Why do you think it worked?",
+            "How do you use SEO without hurting readability?",
+            "How do you manage a content calendar with several contributors?",
+        ],
+        "senior": [
+            "How do you build a content strategy that supports business goals?",
+            "How do you measure the ROI of content?",
+            "Tell me about a time you built or led a team of writers.",
+        ],
+    },
+    "Social Media Manager": {
+        "entry": [
+            "Which platforms do you think fit our brand best, and why?",
+            "How do you plan a week of social content?",
+            "How would you respond to a negative comment on a public post?",
+        ],
+        "mid": [
+            "Tell me about a social campaign you ran and the metrics you tracked.",
+            "How do you grow engagement rather than just followers?",
+            "How do you handle a social media crisis?",
+        ],
+        "senior": [
+            "How do you build a social strategy across several brands or regions?",
+            "How do you connect social performance to revenue?",
+            "Tell me about how you worked with influencers or partners at scale.",
+        ],
+    },
+    "UX/UI Designer": {
+        "entry": [
+            "Walk me through a design you made, from research to final screens.",
+            "How do you run a usability test?",
+            "What accessibility considerations do you apply in your designs?",
+        ],
+        "mid": [
+            "Tell me about a design decision you changed after user research.",
+            "How do you work with engineers to make sure designs are built as intended?",
+            "How do you build and maintain a component library?",
+        ],
+        "senior": [
+            "How do you set a UX research strategy for a product?",
+            "Tell me about a time you influenced product direction through design.",
+            "How do you measure the business impact of UX work?",
+        ],
+    },
+    "Legal Counsel": {
+        "entry": [
+            "How do you review a contract you have never seen before?",
+            "Explain a complex legal concept as if to a non-lawyer.",
+            "How do you stay current with changes in regulation?",
+        ],
+        "mid": [
+            "Tell me about a negotiation where you protected the company's interests without stalling the deal.",
+            "How do you assess legal risk for a new product launch?",
+            "How do you handle a business team that wants to move faster than legal allows?",
+        ],
+        "senior": [
+            "How do you build a compliance program for a growing company?",
+            "Tell me about the most significant legal dispute you managed.",
+            "How do you advise leadership when the law is unclear?",
+        ],
+    },
+    "Operations Manager": {
+        "entry": [
+            "How do you spot inefficiencies in a process?",
+            "Tell me about a time you solved an operational problem under time pressure.",
+            "Which metrics would you track for a daily operation?",
+        ],
+        "mid": [
+            "Walk me through a process improvement you led and its results.",
+            "How do you manage vendors and supply chain risk?",
+            "How do you balance cost reduction with service quality?",
+        ],
+        "senior": [
+            "How do you scale operations for a major expansion?",
+            "Tell me about a Lean or Six Sigma initiative you sponsored.",
+            "How do you build resilient operations against disruptions?",
+        ],
+    },
+    "Teacher / Educator": {
+        "entry": [
+            "How do you plan a lesson for students with different ability levels?",
+            "How do you manage a disruptive classroom?",
+            "How do you know whether students actually understood a lesson?",
+        ],
+        "mid": [
+            "Tell me about a student who was struggling and how you helped them.",
+            "How do you use technology in your teaching?",
+            "How do you communicate with parents about difficult issues?",
+        ],
+        "senior": [
+            "How would you design a curriculum for a whole grade or department?",
+            "How do you mentor and develop other teachers?",
+            "How do you use assessment data to improve school outcomes?",
+        ],
+    },
+    "Nurse / Healthcare Professional": {
+        "entry": [
+            "How do you prioritize care when several patients need you at once?",
+            "Tell me about a time you had to communicate with a distressed patient or family.",
+            "How do you make sure you follow infection control procedures?",
+        ],
+        "mid": [
+            "Describe a clinical situation where you noticed a patient deteriorating. What did you do?",
+            "How do you handle disagreement with a physician about patient care?",
+            "How do you ensure accurate handovers between shifts?",
+        ],
+        "senior": [
+            "How do you lead a care team during a high-pressure situation?",
+            "Tell me about a quality improvement project you led.",
+            "How do you manage staffing and burnout on your unit?",
+        ],
+    },
+}
+
+# Behavioral questions for every role, including custom ones
+GENERAL={
+    "entry": [
+        "Tell me about a time you had to learn something new quickly.",
+        "Describe a mistake you made and what you learned from it.",
+        "How do you organize your work when you have several deadlines?",
+        "Tell me about a time you worked in a team to solve a problem.",
+    ],
+    "mid": [
+        "Tell me about a time you disagreed with a colleague. How did you resolve it?",
+        "Describe a project you are proud of and your specific contribution.",
+        "Tell me about a time you had to deliver with incomplete information.",
+        "How do you handle competing priorities from different stakeholders?",
+    ],
+    "senior": [
+        "Tell me about a time you led a team through a difficult change.",
+        "How do you develop people on your team?",
+        "Describe a strategic decision you made that did not work out. What did you do next?",
+        "How do you build trust with senior stakeholders?",
+    ],
+}
+
+_WORD=re.compile(r"[a-z0-9][a-z0-9+#./-]*")
+_STOP={"a", "an", "the", "and", "or", "but", "of", "to", "in", "on", "for", "with", "at", "by",
+       "from", "as", "is", "are", "was", "were", "be", "been", "it", "its", "this", "that",
+       "you", "your", "we", "our", "i", "me", "my", "they", "them", "their", "he", "she",
+       "do", "does", "did", "have", "has", "had", "how", "what", "when", "why", "which", "who",
+       "would", "could", "should", "will", "can", "not", "so", "if", "about", "tell", "time",
+       "describe", "walk", "through", "us", "also", "just", "like", "really", "some", "there"}
+
+def tokenize(text):
+    """Lowercase content words with a light plural strip, for indexing and queries."""
+    tokens=[]
+    for word in _WORD.findall((text or "").lower()):
+        word=word.strip("./-")
+        if len(word)<2 or word in _STOP:
+            continue
+        if len(word)>3 and word.endswith("s") and not word.endswith("ss"):
+            word=word[:-1]
+        tokens.append(word)
+    return tokens
+
+class BM25Index:
+    """Okapi BM25 over a small fixed set of documents."""
+    def __init__(self, docs, k1=1.5, b=0.75):
+        self.k1=k1
+        self.b=b
+        self._tfs=[Counter(tokenize(doc)) for doc in docs]
+        self._lengths=[sum(tf.values()) for tf in self._tfs]
+        self._avg_len=(sum(self._lengths)/len(self._lengths) if self._lengths else 0) or 1.0
+        df=Counter(term for tf in self._tfs for term in tf)
+        n=len(docs)
+        self._idf={term: math.log(1+(n-count+0.5)/(count+0.5)) for term, count in df.items()}
+
+    def scores(self, query):
+        """BM25 score of every document for the query text."""
+        terms=[t for t in tokenize(query) if t in self._idf]
+        out=[0.0]*len(self._tfs)
+        for i, tf in enumerate(self._tfs):
+            norm=self.k1*(1-self.b+self.b*self._lengths[i]/self._avg_len)
+            for term in terms:
+                f=tf.get(term)
+                if f:
+                    out[i]+=self._idf[term]*f*(self.k1+1)/(f+norm)
+        return out
+
+_REQUIREMENT=re.compile(r"experience|knowledge|proficien|familiar|skill|abilit|understanding|expertise", re.I)
+
+def jd_questions(jd_text, limit=8):
+    """Turns requirement lines from the JD (skills or named tools) into questions."""
+    questions=[]
+    for line in re.split(r"[\n\r•;]+|(?<=\.)\s+", jd_text or ""):
+        line=line.strip(" -*\t.:")
+        if not 4<=len(line.split())<=25:
+            continue
+        if _REQUIREMENT.search(line) or extract_terms(line, limit=1):
+            questions.append(f'This role calls for "{line}". Can you walk me through your experience with that?')
+            if len(questions)>=limit:
+                break
+    return questions
+
+class QuestionBank:
+    """Local question retrieval for one role/difficulty/JD.
+
+    Holds the vetted questions for the role and tier, the behavioral
+    questions and questions derived from the JD, indexed with BM25. It
+    serves a relevant next question without calling the LLM, and suggests
+    candidates for the prompt.
+    """
+    def __init__(self, role, difficulty, jd_text=""):
+        self.role=role
+        tier=LEVELS.get(difficulty, "mid")
+        self.intro=f"Tell me about yourself and why you are interested in this {role} position?"
+        bank=QUESTIONS.get(role, {})
+        self.questions=[q for t in TIERS[tier] for q in bank.get(t, [])]+jd_questions(jd_text)+GENERAL[tier]
+        self._index=BM25Index(self.questions)
+        # JD relevance is fixed for the session, so score it once as a prior
+        jd_scores=self._index.scores(jd_text) if jd_text else [0.0]*len(self.questions)
+        top=max(jd_scores) or 1.0
+        self._prior=[0.5*s/top for s in jd_scores]
+
+    def search(self, text, k=3, exclude=()):
+        """Top-k questions for the text (usually the last answer), skipping the bank entries in exclude."""
+        scores=self._index.scores(text)
+        used=set(exclude)
+        # Ties (e.g. nothing matched) fall back to bank order: role questions first
+        ranked=sorted(range(len(self.questions)), key=lambda i: -(scores[i]+self._prior[i]))
+        return [self.questions[i] for i in ranked if self.questions[i] not in used][:k]
+
+    def next_question(self, answer="", exclude=(), first=False):
+        """A question to ask now: the intro on the first turn, then the best match not in exclude."""
+        if first:
+            return self.intro
+        found=self.search(answer, k=1, exclude=exclude)
+        return found[0] if found else "Is there anything else about your experience you would like to highlight for this role?"
@@ -0,0 +1,238 @@
+import os
+import sys
+import json
+import time
+import threading
+
+class SessionRegistry:
+    """Tracks live interview sessions and bounds the memory they retain.
+
+    Each Streamlit run touches its session with references to the heavy
+    objects it keeps (manager, messages, settings, feedback). Sessions idle
+    longer than idle_ttl, or the least recently used ones once the total
+    passes max_bytes, are spilled to the on-disk journal and cleared in place.
+    Sessions with a script run in progress are never evicted. The next touch
+    from an evicted session loads it back from the journal. Journals that are
+    not reclaimed within journal_ttl are deleted; a session that comes back
+    after that is reported as lost so the caller can start it over.
+    """
+    def __init__(self, idle_ttl=1800, max_bytes=200*1024*1024, journal_dir=".sessions", journal_ttl=3600):
+        self.idle_ttl=idle_ttl
+        self.max_bytes=max_bytes
+        self.journal_dir=journal_dir
+        self.journal_ttl=journal_ttl
+
+        self._lock=threading.Lock()
+        self._sessions={}
+        self._evicted={} # session id -> eviction time
+        self._lost={} # session id -> journal expiry time
+        self._evictions=0
+        self._restores=0
+        self._sweeper=None
+
+    @classmethod
+    def from_env(cls):
+        """Builds a registry from SESSION_IDLE_TTL (s), SESSION_MAX_MB, SESSION_JOURNAL_DIR and SESSION_JOURNAL_TTL (s)."""
+        return cls(
+            idle_ttl=float(os.getenv("SESSION_IDLE_TTL", "1800")),
+            max_bytes=int(float(os.getenv("SESSION_MAX_MB", "200"))*1024*1024),
+            journal_dir=os.getenv("SESSION_JOURNAL_DIR", ".sessions"),
+            journal_ttl=float(os.getenv("SESSION_JOURNAL_TTL", "3600")),
+        )
+
+    def touch(self, session_id, manager=None, messages=None, settings=None, feedback=None):
+        """Marks the session active, restoring it first if it was evicted.
+
+        Returns "restored" after a reload from the journal, "lost" when the
+        session was evicted but its journal is gone, otherwise None.
+        """
+        self._start_sweeper()
+        with self._lock:
+            status=None
+            if session_id in self._evicted:
+                status="restored" if self._restore(session_id, manager, messages, settings, feedback) else "lost"
+            elif self._lost.pop(session_id, None) is not None:
+                status="lost"
+
+            entry={
+                "last_active": time.time(),
+                # The script thread lives until the run (and its st.rerun loop) ends
+                "thread": threading.current_thread(),
+                "manager": manager,
+                "messages": messages,
+                "settings": settings,
+                "feedback": feedback,
+            }
+            entry["bytes"]=_estimate_bytes(_snapshot(entry))
+            self._sessions[session_id]=entry
+            self._enforce_limits(exclude=session_id)
+            return status
+
+    def sweep(self):
+        """Evicts idle sessions, trims to the memory cap and deletes expired journals."""
+        with self._lock:
+            self._enforce_limits()
+            self._expire_journals()
+
+    def stats(self):
+        """Returns live session counts and the bytes they retain (no session ids)."""
+        with self._lock:
+            now=time.time()
+            return {
+                "live_sessions": len(self._sessions),
+                "evicted_sessions": len(self._evicted),
+                "lost_sessions": len(self._lost),
+                "bytes_retained": sum(e["bytes"] for e in self._sessions.values()),
+                "max_bytes": self.max_bytes,
+                "idle_ttl_s": self.idle_ttl,
+                "evictions": self._evictions,
+                "restores": self._restores,
+                "sessions": [
+                    {"idle_s": round(now-e["last_active"], 1), "bytes": e["bytes"]}
+                    for e in sorted(self._sessions.values(), key=lambda e: e["last_active"])
+                ],
+            }
+
+    # --- Internals (call with the lock held) ---
+
+    def _enforce_limits(self, exclude=None):
+        now=time.time()
+        for sid, entry in list(self._sessions.items()):
+            if sid!=exclude and not _running(entry) and now-entry["last_active"]>self.idle_ttl:
+                self._evict(sid)
+
+        total=sum(e["bytes"] for e in self._sessions.values())
+        lru=sorted(self._sessions.items(), key=lambda kv: kv[1]["last_active"])
+        for sid, entry in lru:
+            if total<=self.max_bytes:
+                break
+            # A running script still appends to these objects; clearing them would lose the transcript
+            if sid==exclude or _running(entry):
+                continue
+            total-=entry["bytes"]
+            self._evict(sid)
+
+    def _journal_path(self, session_id):
+        safe="".join(c for c in session_id if c.isalnum() or c in "-_")
+        return os.path.join(self.journal_dir, f"{safe}.json")
+
+    def _evict(self, session_id):
+        entry=self._sessions.pop(session_id)
+        os.makedirs(self.journal_dir, exist_ok=True)
+        with open(self._journal_path(session_id), "w", encoding="utf-8") as f:
+            json.dump(_snapshot(entry), f)
+
+        # Clear in place so the session's own references drop the data too
+        if entry["manager"] is not None:
+            entry["manager"].history=[]
+        for key in ("messages", "settings", "feedback"):
+            if entry[key] is not None:
+                entry[key].clear()
+        _drop_uploaded_files(session_id)
+
+        self._evicted[session_id]=time.time()
+        self._evictions+=1
+
+    def _expire_journals(self):
+        """Deletes journals of sessions that never came back, including ones left by earlier processes."""
+        now=time.time()
+        for sid, evicted_at in list(self._evicted.items()):
+            if now-evicted_at>self.journal_ttl:
+                del self._evicted[sid]
+                _remove(self._journal_path(sid))
+                self._lost[sid]=now
+        # Tabs that never return are forgotten after another journal_ttl
+        for sid, expired_at in list(self._lost.items()):
+            if now-expired_at>self.journal_ttl:
+                del self._lost[sid]
+        try:
+            names=os.listdir(self.journal_dir)
+        except OSError:
+            return
+        for name in names:
+            path=os.path.join(self.journal_dir, name)
+            try:
+                if name.endswith(".json") and now-os.path.getmtime(path)>self.journal_ttl:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def _restore(self, session_id, manager, messages, settings, feedback):
+        """Reloads the session from its journal; False when the journal is missing or unreadable."""
+        path=self._journal_path(session_id)
+        try:
+            with open(path, encoding="utf-8") as f:
+                saved=json.load(f)
+        except (OSError, ValueError):
+            saved=None
+        self._evicted.pop(session_id, None)
+        if saved is None:
+            _remove(path)
+            return False
+
+        if manager is not None and not manager.history:
+            manager.history=saved.get("history", [])
+        if messages is not None and not messages:
+            messages.extend(saved.get("messages", []))
+        if settings is not None and not settings:
+            settings.update(saved.get("settings", {}))
+        if feedback is not None and not feedback:
+            feedback.update(saved.get("feedback", {}))
+
+        self._restores+=1
+        _remove(path)
+        return True
+
+    def _start_sweeper(self):
+        """Starts a daemon thread so abandoned tabs expire even when nobody else is active."""
+        if self._sweeper is not None:
+            return
+        with self._lock:
+            if self._sweeper is not None:
+                return
+            interval=max(1.0, min(60.0, self.idle_ttl/4))
+
+            def _loop():
+                while True:
+                    time.sleep(interval)
+                    self.sweep()
+
+            self._sweeper=threading.Thread(target=_loop, name="session-sweeper", daemon=True)
+            self._sweeper.start()
+
+def _running(entry):
+    thread=entry.get("thread")
+    return thread is not None and thread is not threading.main_thread() and thread.is_alive()
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def _snapshot(entry):
+    """JSON-safe copy of what a session retains."""
+    manager=entry["manager"]
+    return {
+        "history": manager.history if manager is not None else [],
+        "messages": entry["messages"] or [],
+        "settings": entry["settings"] or {},
+        "feedback": entry["feedback"] or {},
+    }
+
+def _estimate_bytes(obj):
+    """Approximate deep size of nested dicts/lists/strings."""
+    size=sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size+=sum(_estimate_bytes(k)+_estimate_bytes(v) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        size+=sum(_estimate_bytes(v) for v in obj)
+    return size
+
+def _drop_uploaded_files(session_id):
+    """Releases camera frames and uploads Streamlit holds for the session."""
+    try:
+        from streamlit.runtime import Runtime
+        Runtime.instance().uploaded_file_mgr.remove_session_files(session_id)
+    except Exception:
+        pass
@@ -0,0 +1,249 @@
+import os
+import time
+import atexit
+import importlib
+import threading
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+
+from audio_capture import AudioCapture, ring_chunks, read_frames
+
+SAMPLE_RATE=16000
+CHUNK=1024
+
+# --- Child process ---
+
+def _run_setup_hook():
+    """Runs SPEECH_WORKER_SETUP ("module:function") in the child, e.g. to install test stubs."""
+    hook=os.getenv("SPEECH_WORKER_SETUP")
+    if hook:
+        module, func=hook.split(":")
+        getattr(importlib.import_module(module), func)()
+
+def _serve_tts(conn):
+    engine=None
+    while True:
+        try:
+            cmd, payload=conn.recv()
+        except EOFError:
+            return
+        started=time.perf_counter()
+        try:
+            if cmd=="speak":
+                if engine is None:
+                    import pyttsx3
+                    engine=pyttsx3.init()
+                    engine.setProperty('rate', 162)
+                engine.say(payload)
+                engine.runAndWait()
+            conn.send(("ok", None, time.perf_counter()-started))
+        except Exception as e:
+            conn.send(("error", str(e), time.perf_counter()-started))
+
+def _serve_mic(conn, shm_name, n_chunks, idle_close):
+    """Owns the input device: opened on "open" (or the first listen), closed on "close" or when idle."""
+    shm=shared_memory.SharedMemory(name=shm_name)
+    ring=np.ndarray((n_chunks, CHUNK), dtype=np.int16, buffer=shm.buf)
+    capture=None
+    last_used=time.monotonic()
+
+    while True:
+        try:
+            if not conn.poll(1.0):
+                # Abandoned tabs never send "close"; don't keep recording for them
+                if capture is not None and time.monotonic()-last_used>idle_close:
+                    capture.close()
+                    capture=None
+                continue
+            cmd, payload=conn.recv()
+        except (EOFError, OSError):
+            break
+        started=time.perf_counter()
+        last_used=time.monotonic()
+        try:
+            if cmd in ("open", "listen") and capture is None:
+                capture=AudioCapture(sample_rate=SAMPLE_RATE, chunk=CHUNK, buffer=ring).start()
+            if cmd=="listen":
+                span=capture.listen_range(**payload)
+                last_used=time.monotonic()
+                conn.send(("ok", span, time.perf_counter()-started))
+                continue
+            if cmd=="close" and capture is not None:
+                capture.close()
+                capture=None
+            conn.send(("ok", capture is not None, time.perf_counter()-started))
+        except Exception as e:
+            conn.send(("error", str(e), time.perf_counter()-started))
+
+    if capture is not None:
+        capture.close()
+    del ring
+    shm.close()
+
+def _worker_main(tts_conn, mic_conn, shm_name, n_chunks, idle_close):
+    """Child entry point: one thread per channel so TTS and capture never block each other."""
+    _run_setup_hook()
+    threading.Thread(target=_serve_tts, args=(tts_conn,), daemon=True).start()
+    _serve_mic(mic_conn, shm_name, n_chunks, idle_close)
+
+# --- Parent side ---
+
+class SpeechWorkerError(Exception):
+    """Raised when the speech process is unavailable or a request fails."""
+
+class SpeechWorker:
+    """Runs TTS playback and mic capture in a supervised child process.
+
+    Commands go over two pipes (TTS and mic), so a long utterance never
+    delays a listen. Captured audio is written by the child into a shared-
+    memory ring, and listen() replies with a chunk range only, so audio
+    bytes are never pickled. A dead or hung child is restarted on the next
+    request and never takes the Streamlit process down.
+
+    The microphone is only open while some session holds it (open_mic /
+    close_mic), and the child also closes it after idle_close seconds
+    without a listen.
+    """
+    def __init__(self, ring_seconds=120, request_timeout=120.0, idle_close=300.0):
+        self.request_timeout=request_timeout
+        self.idle_close=idle_close
+        self._mic_owners=set()
+        self._owners_lock=threading.Lock()
+        self.n_chunks=ring_chunks(ring_seconds, SAMPLE_RATE, CHUNK)
+        self._ctx=mp.get_context("spawn")
+        self._tts_lock=threading.Lock()
+        self._mic_lock=threading.Lock()
+        self._start_lock=threading.Lock()
+        self._proc=None
+        self._shm=None
+        self._ring=None
+        self._tts=None
+        self._mic=None
+        self.restarts=-1
+        self._timings={"speak": [], "listen": []}
+        atexit.register(self.close)
+
+    def start(self):
+        # A restart closes both pipes and swaps the ring, so wait out requests on either channel
+        with self._tts_lock, self._mic_lock, self._start_lock:
+            if self._proc is not None and self._proc.is_alive():
+                return self
+            self._shutdown()
+            self._shm=shared_memory.SharedMemory(create=True, size=self.n_chunks*CHUNK*2)
+            self._ring=np.ndarray((self.n_chunks, CHUNK), dtype=np.int16, buffer=self._shm.buf)
+            self._ring[:]=0
+            self._tts, child_tts=self._ctx.Pipe()
+            self._mic, child_mic=self._ctx.Pipe()
+            self._proc=self._ctx.Process(
+                target=_worker_main,
+                args=(child_tts, child_mic, self._shm.name, self.n_chunks, self.idle_close),
+                name="speech-worker",
+                daemon=True,
+            )
+            self._proc.start()
+            child_tts.close()
+            child_mic.close()
+            self.restarts+=1
+        return self
+
+    def _request(self, op, payload, timeout):
+        """Sends one command and waits for its reply, restarting the child if it died or hung."""
+        if self._proc is None or not self._proc.is_alive():
+            self.start()
+        lock=self._tts_lock if op=="speak" else self._mic_lock
+        with lock:
+            conn=self._tts if op=="speak" else self._mic
+            if conn is None:
+                raise SpeechWorkerError("Speech process is closed")
+            started=time.perf_counter()
+            try:
+                conn.send((op, payload))
+                if not conn.poll(timeout):
+                    raise SpeechWorkerError(f"{op} timed out")
+                status, result, work=conn.recv()
+            except (EOFError, OSError, SpeechWorkerError) as e:
+                self._kill()
+                raise SpeechWorkerError(f"Speech process failed during {op}: {e}")
+            timings=self._timings.get(op)
+            if timings is not None:
+                timings.append((time.perf_counter()-started, work))
+                del timings[:-200]
+            if status!="ok":
+                raise SpeechWorkerError(result)
+            if op=="listen" and result is not None:
+                # Copy out of the ring before the lock lets a restart replace it
+                result=read_frames(self._ring, *result)
+            return result
+
+    def speak(self, text):
+        """Plays text in the child; blocks until playback finishes."""
+        self._request("speak", text, self.request_timeout)
+
+    def open_mic(self, owner):
+        """Starts capture (if needed) for a session's interview."""
+        with self._owners_lock:
+            self._mic_owners.add(owner)
+            self._request("open", None, self.request_timeout)
+
+    def close_mic(self, owner):
+        """Releases a session's hold on the mic; capture stops once nobody holds it."""
+        with self._owners_lock:
+            self._mic_owners.discard(owner)
+            if not self._mic_owners and self._proc is not None and self._proc.is_alive():
+                self._request("close", None, self.request_timeout)
+
+    def listen(self, timeout=5, pause_threshold=3.0, phrase_time_limit=None):
+        """Returns the next phrase as sr.AudioData, or None if no speech started in time."""
+        import speech_recognition as sr
+        payload={"timeout": timeout, "pause_threshold": pause_threshold, "phrase_time_limit": phrase_time_limit}
+        wait=timeout+(phrase_time_limit or self.request_timeout)+pause_threshold
+        frames=self._request("listen", payload, wait)
+        if frames is None:
+            return None
+        return sr.AudioData(frames, SAMPLE_RATE, 2)
+
+    def stats(self):
+        """Round-trip and IPC overhead latency per operation, plus restart count."""
+        out={"alive": bool(self._proc and self._proc.is_alive()), "restarts": max(0, self.restarts), "mic_sessions": len(self._mic_owners)}
+        for op, timings in self._timings.items():
+            if not timings:
+                continue
+            overhead=sorted((rtt-work)*1000 for rtt, work in timings)
+            out[op]={
+                "count": len(timings),
+                "avg_rtt_ms": round(sum(rtt for rtt, _ in timings)/len(timings)*1000, 1),
+                "ipc_p50_ms": round(overhead[(len(overhead)-1)//2], 2),
+                "ipc_p95_ms": round(overhead[int(0.95*(len(overhead)-1))], 2),
+            }
+        return out
+
+    def reset_stats(self):
+        """Clears the latency samples (e.g. between load-test levels)."""
+        for timings in self._timings.values():
+            timings.clear()
+
+    def _kill(self):
+        if self._proc is not None and self._proc.is_alive():
+            self._proc.kill()
+            self._proc.join(timeout=1.0)
+
+    def _shutdown(self):
+        for conn in (self._tts, self._mic):
+            if conn is not None:
+                conn.close()
+        if self._proc is not None:
+            self._proc.join(timeout=1.0)
+            self._kill()
+        if self._shm is not None:
+            self._ring=None
+            self._shm.close()
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+        self._proc=self._shm=self._tts=self._mic=None
+
+    def close(self):
+        with self._tts_lock, self._mic_lock, self._start_lock:
+            self._shutdown()
@@ -0,0 +1,228 @@
+import re
+from collections import deque
+
+# Curated tools/technologies across the roles offered on the config page.
+VOCABULARY=[
+    # Languages & runtimes
+    "Python", "Java", "JavaScript", "TypeScript", "Golang", "Rust", "Kotlin", "Swift", "Scala",
+    "C++", "C#", "Ruby", "PHP", "SQL", "Bash", "Node.js", "Deno", ".NET", "Elixir",
+    # Frameworks & libraries
+    "React.js", "React Native", "Angular", "Vue.js", "Next.js", "Svelte", "Django", "Flask",
+    "FastAPI", "Spring Boot", "Express.js", "Rails", "Laravel", "GraphQL", "gRPC", "REST API",
+    "Pandas", "NumPy", "scikit-learn", "TensorFlow", "PyTorch", "Keras", "Hugging Face",
+    "LangChain", "Spark", "Hadoop", "Airflow", "dbt", "Streamlit",
+    # Data stores & messaging
+    "PostgreSQL", "MySQL", "SQLite", "MongoDB", "Redis", "Memcached", "Cassandra", "DynamoDB",
+    "Elasticsearch", "Snowflake", "BigQuery", "Redshift", "Kafka", "RabbitMQ", "SQS", "Pub/Sub",
+    # Infrastructure & cloud
+    "AWS", "Azure", "GCP", "Docker", "Kubernetes", "Terraform", "Ansible", "Jenkins",
+    "GitHub Actions", "GitLab CI", "CI/CD", "Prometheus", "Grafana", "Datadog", "Nginx",
+    "Lambda", "EC2", "S3", "Linux", "Git", "microservice", "serverless", "load balancer",
+    # Product, design & analytics
+    "Jira", "Confluence", "Figma", "Sketch", "Adobe XD", "Photoshop", "Illustrator",
+    "InDesign", "Miro", "Tableau", "Power BI", "Looker", "Excel", "Google Analytics",
+    "Mixpanel", "Amplitude", "A/B testing", "OKRs", "Agile", "Scrum", "Kanban",
+    # Sales, marketing, HR & operations
+    "Salesforce", "HubSpot", "Marketo", "Mailchimp", "SEO", "SEM", "Google Ads", "CRM",
+    "Zendesk", "Intercom", "Workday", "BambooHR", "SAP", "Oracle", "QuickBooks", "NetSuite",
+    "Six Sigma", "Lean manufacturing", "ERP", "Hootsuite", "Canva", "WordPress",
+]
+
+# Alternate spellings mapped to their canonical name.
+ALIASES={
+    "golang": "Golang", "js": "JavaScript", "ts": "TypeScript",
+    "nodejs": "Node.js", "reactjs": "React.js", "react native": "React Native",
+    "vue": "Vue.js", "nextjs": "Next.js", "springboot": "Spring Boot", "sklearn": "scikit-learn",
+    "postgres": "PostgreSQL", "mongo": "MongoDB", "elastic search": "Elasticsearch",
+    "k8s": "Kubernetes", "gcloud": "GCP", "google cloud": "GCP", "amazon web services": "AWS",
+    "microservices": "microservice", "powerbi": "Power BI", "ab testing": "A/B testing",
+    "github action": "GitHub Actions", "ci cd": "CI/CD", "continuous integration": "CI/CD",
+}
+
+# Tools that are also ordinary English words ("I excel at", "to spark interest").
+# The bare word only matches when capitalized; these qualified phrases match in any case.
+AMBIGUOUS={
+    "Excel": ["microsoft excel", "ms excel", "excel spreadsheet", "excel sheet", "excel formula", "excel macro", "in excel"],
+    "Spark": ["apache spark", "pyspark", "spark job", "spark cluster", "spark streaming", "spark sql"],
+    "Swift": ["swiftui", "swift ui", "swift code", "swift language", "in swift"],
+    "Lambda": ["aws lambda", "lambda function"],
+    "Sketch": ["sketch app", "in sketch"],
+    "Rust": ["rust language", "rust code", "in rust"],
+    "Node.js": ["node server", "node backend", "node service", "node app", "node js"],
+    "Agile": ["agile methodology", "agile team", "agile process", "agile sprint", "agile framework"],
+    "Miro": ["miro board"],
+    "Ruby": ["ruby on rails", "ruby code", "in ruby"],
+    "Rails": ["on rails app", "rails app"],
+    "Oracle": ["oracle database", "oracle db", "oracle sql"],
+    "Amplitude": ["amplitude analytics", "in amplitude"],
+    "Bash": ["bash script", "bash scripts", "bash scripting", "bash shell", "in bash"],
+    "React.js": ["react app", "react component", "react components", "react hooks", "react frontend", "in react"],
+    "Angular": ["angularjs", "angular app", "angular component", "in angular"],
+    "Svelte": ["sveltekit", "svelte app"],
+    "Flask": ["flask app", "flask api", "python flask", "in flask"],
+    "Pandas": ["pandas dataframe", "python pandas", "pandas library", "in pandas"],
+    "Airflow": ["apache airflow", "airflow dag", "airflow dags"],
+    "Elixir": ["elixir phoenix", "in elixir"],
+    "Snowflake": ["snowflake warehouse", "snowflake data warehouse", "in snowflake"],
+    "Redshift": ["amazon redshift", "aws redshift", "redshift cluster", "in redshift"],
+    "Illustrator": ["adobe illustrator", "in illustrator"],
+    "Looker": ["looker studio", "looker dashboard", "in looker"],
+    "Confluence": ["confluence page", "confluence wiki", "in confluence"],
+    "Intercom": ["intercom chat", "intercom messenger", "in intercom"],
+    "Workday": ["workday hcm", "in workday"],
+    "SAP": ["sap erp", "sap hana", "in sap"],
+}
+# Bare words matched case-sensitively, mapped to their canonical name
+_CASED={"Node": "Node.js", "React": "React.js"}
+_CASED.update({name: name for name in AMBIGUOUS if name.isalpha()})
+
+# Heuristics for tool-like tokens in a JD or resume that the vocabulary may miss
+_CAMEL=re.compile(r"\b[A-Z][a-z]+[A-Z][A-Za-z0-9]*\b")                # PostgreSQL, TensorFlow
+_ACRONYM=re.compile(r"\b[A-Z][A-Z0-9]{1,5}\b")                         # AWS, ETL, S3
+_DOTTED=re.compile(r"\b[A-Za-z][\w-]*\.(?:js|io|py|net)\b", re.I)      # Node.js, Socket.io
+_NAME_PREFIX=re.compile(r"^(?:Mc|Mac)[A-Z]")                          # McDonald, MacKenzie
+# Contact and header lines (email, links, phone numbers) name sites and people, not tools
+_CONTACT=re.compile(r"@|https?://|www\.|\.com\b|\+?\d[\d ().-]{7,}\d|\b(?:linkedin|github|email|e-mail|phone|mobile|tel)\b", re.I)
+# Lines (or sections) that list skills or tools; bare acronyms only count there
+_SKILL_CONTEXT=re.compile(
+    r"\b(?:skills?|tools?|technolog\w*|tech stack|stack|frameworks?|librar\w*|languages?|platforms?|software|"
+    r"databases?|proficien\w*|experience (?:with|in|using)|familiar\w* with|knowledge of|expertise in|"
+    r"hands-on|worked with|using|requirements?|qualifications?|must[- ]have|nice[- ]to[- ]have)\b",
+    re.I,
+)
+# Ordinary words that show up in capitals in headings, names and degrees
+_COMMON_WORDS={
+    "I", "A", "AN", "THE", "AND", "OR", "BUT", "NOT", "NO", "YES", "WE", "YOU", "OUR", "US", "ME", "MY",
+    "IT", "ITS", "TO", "IN", "OF", "ON", "FOR", "BY", "AT", "AS", "IS", "BE", "ARE", "WAS", "DO", "DOES",
+    "DID", "GO", "GET", "HAVE", "HAS", "HAD", "WILL", "CAN", "MAY", "ALL", "ANY", "NEW", "WHAT", "WHO",
+    "HOW", "WHY", "WHEN", "WHERE", "WITH", "FROM", "INTO", "ABOUT", "OVER", "PLUS", "NICE", "MUST", "JOIN",
+    "WORK", "JOB", "ROLE", "TEAM", "SKILL", "SKILLS", "TOOL", "TOOLS", "STACK", "EXPERT", "BASIC",
+    "ADVANCED", "SUMMARY", "PROFILE", "CONTACT", "EDUCATION", "PROJECT", "PROJECTS", "OBJECTIVE",
+    "EXPERIENCE", "LANGUAGES", "REQUIREMENTS", "QUALIFICATIONS", "RESPONSIBILITIES", "BENEFITS",
+    "AWARDS", "REFERENCES", "HOBBIES", "INTERESTS", "CV", "JD", "HR", "OK", "USA", "UK", "EU", "PM",
+    "AM", "ETC", "EG", "IE", "NA", "TBD", "FAQ", "GPA", "MBA", "BA", "BS", "BSC", "MA", "MS", "MSC",
+    "PHD", "CEO", "CTO", "CFO", "VP", "LLC", "INC", "LTD", "MR", "MRS", "MS", "DR", "ASAP",
+}
+
+def _is_heading(line):
+    # Short lines in capitals or ending with ":" ("SKILLS", "Nice to have:"), but not inline lists
+    return "," not in line and len(line.split())<=5 and (line.endswith(":") or line.isupper())
+
+def extract_terms(text, limit=200):
+    """Pulls tool-like tokens out of a JD or resume.
+
+    Dotted and digit-bearing tokens always count. CamelCase tokens and other
+    acronyms count only on lines, or under headings, that list skills or
+    tools, and never when they are ordinary words or names (headings,
+    surnames, degrees). Contact lines are skipped.
+    """
+    found={}
+    skills_section=False
+    for line in (text or "").splitlines():
+        line=line.strip(" \t-*•")
+        if not line or _CONTACT.search(line):
+            continue
+        heading=_is_heading(line)
+        if heading:
+            skills_section=bool(_SKILL_CONTEXT.search(line))
+        tokens=_DOTTED.findall(line)
+        context=not heading and (skills_section or _SKILL_CONTEXT.search(line))
+        if context:
+            tokens+=[m for m in _CAMEL.findall(line) if not _NAME_PREFIX.match(m)]
+        for match in _ACRONYM.findall(line):
+            if any(ch.isdigit() for ch in match) or (context and match not in _COMMON_WORDS):
+                tokens.append(match)
+        for match in tokens:
+            if match.upper() in _COMMON_WORDS:
+                continue
+            found.setdefault(match.lower(), match)
+            if len(found)>=limit:
+                return found
+    return found
+
+class TermIndex:
+    """Aho-Corasick automaton over lowercase terms.
+
+    Built once, then find() scans a transcript in a single pass, no matter
+    how many terms are indexed.
+    """
+    def __init__(self, terms, cased=None):
+        # terms: {lowercase pattern: canonical name}
+        # cased: {word: canonical name} matched only when written exactly so
+        self._goto=[{}]
+        self._fail=[0]
+        self._out=[[]]
+        for pattern, canonical in terms.items():
+            self._insert(pattern, canonical)
+        for word, canonical in (cased or {}).items():
+            self._insert(word.lower(), canonical, word)
+        self._build_failure_links()
+        self.size=len(terms)+len(cased or {})
+
+    def _insert(self, pattern, canonical, cased=None):
+        state=0
+        for ch in pattern:
+            nxt=self._goto[state].get(ch)
+            if nxt is None:
+                nxt=len(self._goto)
+                self._goto[state][ch]=nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state=nxt
+        self._out[state].append((len(pattern), canonical, cased))
+
+    def _build_failure_links(self):
+        queue=deque(self._goto[0].values())
+        while queue:
+            state=queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail=self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail=self._fail[fail]
+                self._fail[nxt]=self._goto[fail].get(ch, 0)
+                self._out[nxt]=self._out[nxt]+self._out[self._fail[nxt]]
+
+    def find(self, text):
+        """Returns canonical terms mentioned in text, in order of first mention."""
+        lower=text.lower()
+        n=len(lower)
+        matches=[]
+        state=0
+        for i, ch in enumerate(lower):
+            while state and ch not in self._goto[state]:
+                state=self._fail[state]
+            state=self._goto[state].get(ch, 0)
+            for length, canonical, cased in self._out[state]:
+                start=i-length+1
+                if cased is not None and text[start:i+1]!=cased:
+                    continue
+                # Whole-word matches only ("Java" should not match inside "JavaScript",
+                # "js" not inside "Node.js")
+                if start>0 and (lower[start-1].isalnum() or (lower[start-1]=="." and start>1 and lower[start-2].isalnum())):
+                    continue
+                if i+1<n and lower[i+1].isalnum():
+                    continue
+                matches.append((start, i+1, canonical, cased))
+        found={}
+        for start, end, canonical, cased in matches:
+            # A bare word inside a longer term ("React" in "React Native") is part of that term
+            if cased is not None and any(s<=start and end<=e and e-s>end-start for s, e, _, _ in matches):
+                continue
+            found.setdefault(canonical, start)
+        return sorted(found, key=found.get)
+
+def build_term_index(jd_text="", resume_text=""):
+    """Builds the index from the curated vocabulary plus terms found in the JD and resume."""
+    terms={}
+    terms.update(extract_terms(resume_text))
+    terms.update(extract_terms(jd_text))
+    terms.update({term.lower(): term for term in VOCABULARY if term not in _CASED})
+    terms.update(ALIASES)
+    for canonical, phrases in AMBIGUOUS.items():
+        terms.update({phrase: canonical for phrase in phrases})
+    # Bare English words never match case-insensitively, even when the JD or resume lists them
+    for word in _CASED:
+        terms.pop(word.lower(), None)
+    return TermIndex(terms, _CASED)
@@ -0,0 +1,71 @@
+from term_index import build_term_index, extract_terms
+
+RESUME="""JOHN SMITH
+ABOUT ME
+Backend developer who likes clean code.
+WORK EXPERIENCE
+Built APIs at ACME for six years.
+SKILLS
+SQL, AWS, GCP, PostgreSQL, EC2
+EDUCATION
+GPA 3.9, MBA
+"""
+
+JD="""ABOUT US
+We build tools for small teams.
+WHAT YOU WILL DO
+Ship features every week.
+NICE TO HAVE
+Kafka, ETL pipelines, Node.js
+Experience with S3.
+"""
+
+def test_headings_names_and_degrees_are_not_terms():
+    terms=extract_terms(RESUME)
+    for word in ("john", "smith", "about", "me", "work", "experience", "skills", "education", "gpa", "mba", "acme"):
+        assert word not in terms
+
+def test_skills_context_and_structured_tokens_are_terms():
+    assert set(extract_terms(RESUME))=={"sql", "aws", "gcp", "postgresql", "ec2"}
+    assert set(extract_terms(JD))=={"etl", "node.js", "s3"}
+
+def test_plain_question_detects_nothing():
+    index=build_term_index(JD, RESUME)
+    assert index.find("I want to know what you do with me")==[]
+
+def test_ambiguous_words_need_capitals_or_a_qualifier():
+    index=build_term_index()
+    assert index.find("I excel at helping people and want to spark interest in a node of the graph")==[]
+    assert index.find("the lambda sketch was swift, rust on the agile miro")==[]
+    assert index.find("I used Excel and Spark on a Node service")==["Excel", "Spark", "Node.js"]
+    assert index.find("we ran pyspark jobs, an aws lambda, microsoft excel and an agile team")==["Spark", "AWS", "Lambda", "Excel", "Agile"]
+
+def test_whole_word_matching():
+    index=build_term_index()
+    assert index.find("JavaScript and Node.js")==["JavaScript", "Node.js"]
+    assert index.find("I know JS.")==["JavaScript"]
+
+def test_english_words_need_capitals_or_a_qualifier():
+    index=build_term_index()
+    assert index.find("i had a bash with the team and a lean approach")==[]
+    assert index.find("the intercom was broken")==[]
+    assert index.find("she is an illustrator and a looker")==[]
+    assert index.find("the sap ran down a snowflake with a redshift")==[]
+    assert index.find("we wrote a bash script and loaded Snowflake from an aws redshift cluster")==["Bash", "Snowflake", "AWS", "Redshift"]
+
+def test_bare_react():
+    index=build_term_index()
+    assert index.find("I used React")==["React.js"]
+    assert index.find("I react well to feedback")==[]
+    assert index.find("I built React Native apps")==["React Native"]
+
+def test_names_and_contact_lines_are_not_terms():
+    resume="""Ronald McDonald
+ronald@mail.com | linkedin.com/in/ronald | GitHub: ronald
++1 (555) 123-4567
+EXPERIENCE
+Consultant at McKinsey, shipped a YouTube series.
+SKILLS
+TensorFlow, GraphQL
+"""
+    assert set(extract_terms(resume))=={"tensorflow", "graphql"}